@@ -1,13 +1,57 @@
 import csv
+import json
+import logging
+import os
 import sys
+import time
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional speedup for decoding large payloads
+    orjson = None
+
+# Per-protocol chain details; enable with logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
 
 # Global configuration variables
 METRIC_START_DATE = "2025-03-20T16:00:00Z"
 METRIC_END_DATE = "2025-06-12T16:00:00Z"
 
+# Concurrency and retry settings for DeFiLlama fetches
+MAX_WORKERS = 16
+FETCH_RETRIES = 5
+FETCH_BACKOFF_SECONDS = 0.5
+
+# On-disk cache of DeFiLlama responses, one file per slug; TVL histories only
+# update a few times a day, so reruns within the TTL skip the network entirely
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "llama")
+CACHE_TTL_SECONDS = 6 * 60 * 60
+
+# Transient failures (connection errors, 429 and 5xx) are retried by the
+# adapter with exponential backoff, honouring Retry-After
+FETCH_RETRY = Retry(
+    total=FETCH_RETRIES,
+    backoff_factor=FETCH_BACKOFF_SECONDS,
+    status_forcelist=(429, 500, 502, 503, 504),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+# One keep-alive session shared by all fetch threads, sized to the worker pool
+SESSION = requests.Session()
+# gzip only: brotli decoding would need an extra optional dependency in urllib3
+SESSION.headers.update({"Accept-Encoding": "gzip", "User-Agent": "metric-report/1.0"})
+SESSION.mount("https://", HTTPAdapter(pool_maxsize=MAX_WORKERS, max_retries=FETCH_RETRY))
+
 # Mapping using your specified slugs
 protocol_slugs = {
     "Rocket Pool": "rocket-pool",
@@ -34,6 +78,7 @@ protocol_slugs = {
     "TLX Finance": "tlx-finance",
 }
 
+@lru_cache(maxsize=256)
 def normalize_chain_name(raw_name: str) -> str:
     """Return a consistent name for known synonyms, e.g. 'Optimism' -> 'op mainnet'."""
     lowered = raw_name.lower().strip()
@@ -46,17 +91,71 @@ superchain_chains = [
     "bob", "base", "ink", "lisk", "mode", "op mainnet", 
     "polynomial", "soneium", "swellchain", "unichain", "world chain"
 ]
+# Normalized once for O(1) membership checks in extract_history_data
+_SUPERCHAIN_SET = frozenset(c.replace(" ", "").lower() for c in superchain_chains)
+
+@lru_cache(maxsize=256)
+def _superchain_key(unified_name: str) -> str:
+    """Key used to match a chain name against _SUPERCHAIN_SET."""
+    return unified_name.replace(" ", "").lower()
+
+def _loads(raw: bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+def _dumps(obj) -> bytes:
+    return orjson.dumps(obj) if orjson is not None else json.dumps(obj).encode()
+
+def _cache_path(slug: str) -> str:
+    return os.path.join(CACHE_DIR, f"{slug}.json")
 
+def load_cached_protocol_data(slug: str):
+    """Return the cached body for a slug if it is younger than CACHE_TTL_SECONDS, else None"""
+    try:
+        with open(_cache_path(slug), "rb") as f:
+            entry = _loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or time.time() - entry.get("ts", 0) >= CACHE_TTL_SECONDS:
+        return None
+    return entry.get("body")
+
+def store_cached_protocol_data(slug: str, body) -> None:
+    """Atomically write {"ts", "body"} for a slug (temp file + os.replace)"""
+    path = _cache_path(slug)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(_dumps({"ts": time.time(), "body": body}))
+        os.replace(tmp, path)
+    except OSError as e:
+        # The cache is only an optimization; a failed write must not fail the run
+        print(f"Warning: could not cache data for {slug}: {e}")
+
+@lru_cache(maxsize=None)
 def fetch_protocol_data(slug: str) -> dict:
-    """Fetch protocol data from DeFiLlama API"""
+    """Fetch protocol data from DeFiLlama API (transient errors are retried by SESSION).
+
+    Served from the on-disk cache when fresh; memoized per slug for the run.
+    Callers must treat the result as read-only.
+    """
+    cached = load_cached_protocol_data(slug)
+    if cached is not None:
+        return cached
     url = f"https://api.llama.fi/protocol/{slug}"
     try:
-        r = requests.get(url, timeout=30)
+        r = SESSION.get(url, timeout=30)
         r.raise_for_status()
-        return r.json()
+        data = _loads(r.content)
     except Exception as e:
         print(f"Error fetching data for {slug}: {e}")
         return None
+    store_cached_protocol_data(slug, data)
+    return data
+
+def submit_protocol_fetches(pool, slugs) -> dict:
+    """Start fetching every slug on `pool`; returns a mapping of slug -> Future of protocol data (or None)"""
+    return {s: pool.submit(fetch_protocol_data, s) for s in slugs}
 
 def get_history_list(chain_data):
     """Extract the history list from chain data"""
@@ -68,116 +167,141 @@ def get_history_list(chain_data):
 
 def extract_timestamp(entry) -> float:
     """Extract timestamp from an entry"""
-    try:
-        if isinstance(entry, dict):
-            for k in ["date", "t", "timestamp"]:
-                if k in entry:
-                    return float(entry[k])
-        elif isinstance(entry, list) and entry:
-            return float(entry[0])
-    except Exception:
-        pass
+    if isinstance(entry, dict):
+        for k in ("date", "t", "timestamp"):
+            if k in entry:
+                return _to_float(entry[k])
+    elif isinstance(entry, list) and entry:
+        return _to_float(entry[0])
     return None
 
+def _to_float(v) -> float:
+    # Numeric timestamps are the norm; only odd inputs take the guarded path
+    if type(v) is int or type(v) is float:
+        return float(v)
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
 def extract_value(entry) -> float:
     """Extract TVL value from an entry"""
-    try:
-        return entry['totalLiquidityUSD']
-    except Exception:
-        pass
+    if isinstance(entry, dict):
+        return entry.get('totalLiquidityUSD', 0)
     return 0
 
 def extract_history_data(protocol_data: dict, protocol_name: str) -> dict:
     """
     Extract all historical data for a protocol across relevant chains.
-    Returns a dictionary mapping chain names to lists of (timestamp, value) pairs.
+    Returns a dictionary mapping chain names to parallel (timestamps, values)
+    float64 arrays sorted by timestamp.
     """
     if not protocol_data or "chainTvls" not in protocol_data:
         print(f"No chainTvls data for '{protocol_name}'")
         return {}
         
     chain_tvls = protocol_data["chainTvls"]
-    # Print all keys found in chainTvls
-    print(f"chainTvls keys for '{protocol_name}': {list(chain_tvls.keys())}")
+    logger.debug("chainTvls keys for '%s': %s", protocol_name, list(chain_tvls))
 
     found_superchain_chains = []
     out = {}
     
     for chain_name, chain_data in chain_tvls.items():
         unified_name = normalize_chain_name(chain_name)
-        norm = unified_name.replace(" ", "").lower()
+        norm = _superchain_key(unified_name)
 
-        if any(norm == c.replace(" ", "").lower() for c in superchain_chains):
-            hist = []
+        if norm in _SUPERCHAIN_SET:
+            ts_list, vals = array("d"), array("d")
+            in_order = True
             history_list = get_history_list(chain_data)
             for entry in history_list:
-                ts = extract_timestamp(entry)
-                if ts is not None:
-                    tvl = extract_value(entry)
-                    hist.append((ts, tvl))
-            if hist:
-                out[unified_name] = sorted(hist, key=lambda x: x[0])
+                # DefiLlama points are {"date": <number>, "totalLiquidityUSD": ...}; read
+                # those inline and leave any other shape to the generic extractors
+                if type(entry) is dict and type(date := entry.get("date")) in (int, float):
+                    ts = float(date)
+                    value = entry.get("totalLiquidityUSD", 0)
+                else:
+                    ts = extract_timestamp(entry)
+                    if ts is None:
+                        continue
+                    value = extract_value(entry)
+                if type(value) is not float and type(value) is not int:
+                    # Null or malformed TVL: drop the point so both arrays stay aligned
+                    value = _to_float(value)
+                    if value is None:
+                        continue
+                if ts_list and ts < ts_list[-1]:
+                    in_order = False
+                ts_list.append(ts)
+                vals.append(value)
+            if ts_list:
+                # DefiLlama histories arrive sorted; only reorder if they don't
+                if not in_order:
+                    order = sorted(range(len(ts_list)), key=ts_list.__getitem__)
+                    ts_list = array("d", (ts_list[i] for i in order))
+                    vals = array("d", (vals[i] for i in order))
+                out[unified_name] = (ts_list, vals)
                 found_superchain_chains.append(unified_name)
 
-    # Print summary of recognized "superchain" chains
-    print(f"Found {len(found_superchain_chains)} superchain chain(s) for '{protocol_name}': {found_superchain_chains}")
+    logger.debug(
+        "Found %d superchain chain(s) for '%s': %s",
+        len(found_superchain_chains), protocol_name, found_superchain_chains,
+    )
     return out
 
 def calculate_average_tvl_in_range(history_entries, start_ts, end_ts):
     """Calculate average TVL within a date range, return None if no data points exist"""
-    points = [(ts, v) for ts, v in history_entries if start_ts < ts <= end_ts]
-    if not points:
+    ts_list, vals = history_entries
+    # Timestamps are sorted, so the (start_ts, end_ts] window is a contiguous slice
+    lo = bisect_right(ts_list, start_ts)
+    hi = bisect_right(ts_list, end_ts)
+    if lo == hi:
         return None
-    assert len(points) <= 7
-    return sum(v for _, v in points) / len(points)
+    assert hi - lo <= 7
+    return sum(vals[lo:hi]) / (hi - lo)
 
-def process_protocol(slug: str, protocol_name: str) -> dict:
-    """Process a single protocol and extract its history data"""
-    data = fetch_protocol_data(slug)
+def process_protocol(data: dict, protocol_name: str) -> dict:
+    """Process a single protocol's fetched data and extract its history data"""
     if not data:
         return {}
     return extract_history_data(data, protocol_name)
 
-def calculate_7day_averages(history_data: dict, target_ts: float) -> float:
+def calculate_7day_averages(history_data: dict, target_timestamps) -> list:
     """
-    Calculate 7-day averages for all chains in the history data.
-    If a chain has no data in the window, skip it rather than failing.
+    Calculate the summed 7-day average TVL across chains for each target timestamp.
+    If a chain has no data in a window, skip it rather than failing.
     """
-    start_ts = target_ts - 7 * 24 * 60 * 60
-    total = 0
-    for chain_key, entries in history_data.items():
-        avg = calculate_average_tvl_in_range(entries, start_ts, target_ts)
-        if avg is None:
-            print(f"Warning: Chain '{chain_key}' has no data in the 7-day window near timestamp {target_ts}")
-            continue
-        total += avg
-    return total
+    totals = []
+    for target_ts in target_timestamps:
+        start_ts = target_ts - 7 * 24 * 60 * 60
+        total = 0
+        for chain_key, entries in history_data.items():
+            avg = calculate_average_tvl_in_range(entries, start_ts, target_ts)
+            if avg is None:
+                print(f"Warning: Chain '{chain_key}' has no data in the 7-day window near timestamp {target_ts}")
+                continue
+            total += avg
+        totals.append(total)
+    return totals
 
-def process_protocol_or_slugs(slugs, ts1, ts2, protocol_name: str):
+def process_protocol_or_slugs(slugs, ts1, ts2, protocol_name: str, fetched: dict):
     """
-    Process a protocol (which may consist of multiple slugs).
+    Process a protocol (which may consist of multiple slugs) from prefetched data.
     Returns (avg1, avg2) tuple.
     """
-    if isinstance(slugs, list):
-        total1, total2 = 0, 0
-        for s in slugs:
-            hist = process_protocol(s, f"{protocol_name} ({s})")
-            if not hist:
-                print(f"No history data for '{protocol_name}' slug '{s}'")
-                continue
-            a1 = calculate_7day_averages(hist, ts1)
-            a2 = calculate_7day_averages(hist, ts2)
-            total1 += a1
-            total2 += a2
-        return total1, total2
-    else:
-        hist = process_protocol(slugs, protocol_name)
+    multi = isinstance(slugs, list)
+    total1, total2 = 0, 0
+    for s in (slugs if multi else [slugs]):
+        label = f"{protocol_name} ({s})" if multi else protocol_name
+        hist = process_protocol(fetched.get(s), label)
         if not hist:
-            print(f"No history data for '{protocol_name}'")
-            return 0, 0
-        a1 = calculate_7day_averages(hist, ts1)
-        a2 = calculate_7day_averages(hist, ts2)
-        return a1, a2
+            print(f"No history data for '{protocol_name}' slug '{s}'" if multi else f"No history data for '{protocol_name}'")
+            continue
+        # Both windows are bisected out of the same sorted history in one call
+        a1, a2 = calculate_7day_averages(hist, (ts1, ts2))
+        total1 += a1
+        total2 += a2
+    return total1, total2
 
 def main():
     """Main function to process protocols and generate CSV report"""
@@ -198,24 +322,41 @@ def main():
         f"  Start Date: {d1}\n  End Date:   {d2}\n"
     )
 
+    # Fetch every slug (including sub-slugs of multi-slug protocols) concurrently
+    all_slugs = list(dict.fromkeys(
+        s
+        for slug_data in protocol_slugs.values()
+        for s in (slug_data if isinstance(slug_data, list) else [slug_data])
+    ))
+    print(f"Fetching {len(all_slugs)} protocol(s) from DeFiLlama ...")
+
     try:
-        with open(out_file, "w", newline="") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=headers)
-            writer.writeheader()
+        # Protocols are processed in order, each as soon as its own slugs have
+        # arrived, so parsing overlaps with the fetches still in flight
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            pending = submit_protocol_fetches(pool, all_slugs)
+            rows = []
             for name, slug_data in protocol_slugs.items():
+                slugs = slug_data if isinstance(slug_data, list) else [slug_data]
+                fetched = {s: pending[s].result() for s in slugs}
                 print(f"\nProcessing '{name}' ...")
-                
-                tvl1, tvl2 = process_protocol_or_slugs(slug_data, ts1, ts2, name)
+
+                tvl1, tvl2 = process_protocol_or_slugs(slug_data, ts1, ts2, name, fetched)
                 diff = tvl2 - tvl1
-                row = {
+                rows.append({
                     "protocol": name,
                     f"7d_avg_tvl_{sd1}": round(tvl1),
                     f"7d_avg_tvl_{sd2}": round(tvl2),
                     "difference": round(diff),
-                }
-                writer.writerow(row)
+                })
                 print(f"  -> 7d Avg at start={tvl1:.2f}, end={tvl2:.2f}, diff={diff:.2f}")
 
+        # All rows are computed before the file is opened, then written in one batch
+        with open(out_file, "w", newline="") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=headers)
+            writer.writeheader()
+            writer.writerows(rows)
+
         print(f"\nCSV '{out_file}' created successfully.\n")
     except Exception as e:
         print(f"Error: {e}")
@@ -4,6 +4,19 @@ import json
 import sys
 from datetime import datetime, timedelta
 from statistics import mean
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+SESSION = requests.Session()
+SESSION.headers["Accept-Encoding"] = "gzip"
+# Retry transient failures (connection errors, 429 and 5xx) with backoff
+SESSION.mount("https://", HTTPAdapter(max_retries=Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)))
 
 def calculate_unichain_30day_average(protocol_slug):
     """Calculate 30-day trailing average for a protocol on Unichain (TVL + Borrowed)"""
@@ -11,7 +24,7 @@ def calculate_unichain_30day_average(protocol_slug):
     # Fetch protocol data
     protocol_url = f"https://api.llama.fi/protocol/{protocol_slug}"
     print(f"Fetching {protocol_slug} data...")
-    response = requests.get(protocol_url)
+    response = SESSION.get(protocol_url, timeout=30)
     
     if response.status_code != 200:
         print(f"Error: Failed to fetch protocol data (HTTP {response.status_code})")
@@ -38,42 +51,37 @@ def calculate_unichain_30day_average(protocol_slug):
     
     print(f"\nProcessing data from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
     
-    # Process TVL data
-    tvl_by_date = {}
-    for point in unichain_tvl_data:
-        if 'date' in point:
-            date = datetime.fromtimestamp(point['date'])
-            # Compare just the date part, not the time
-            if start_date.date() <= date.date() <= end_date.date():
-                date_str = date.strftime('%Y-%m-%d')
-                tvl_by_date[date_str] = point.get('totalLiquidityUSD', 0)
-    
-    # Process borrowed data
-    borrowed_by_date = {}
-    for point in unichain_borrowed_data:
-        if 'date' in point:
-            date = datetime.fromtimestamp(point['date'])
-            # Compare just the date part, not the time
-            if start_date.date() <= date.date() <= end_date.date():
-                date_str = date.strftime('%Y-%m-%d')
-                borrowed_by_date[date_str] = point.get('totalLiquidityUSD', 0)
-    
-    print(f"\nFound TVL data for {len(tvl_by_date)} days")
-    print(f"Found Borrowed data for {len(borrowed_by_date)} days")
+    # Bucket points by day offset from the local midnight of start_date
+    # (same calendar-day semantics as comparing datetime.fromtimestamp dates,
+    # without building a datetime per point; the window spans no DST change)
+    base_ts = int(start_date.timestamp())
+    
+    def bucket_by_day(points):
+        days = [None] * 30
+        for point in points:
+            if 'date' in point:
+                day = (int(point['date']) - base_ts) // 86400
+                if 0 <= day < 30:
+                    days[day] = point.get('totalLiquidityUSD', 0)
+        return days
+    
+    tvl_by_day = bucket_by_day(unichain_tvl_data)
+    borrowed_by_day = bucket_by_day(unichain_borrowed_data)
+    
+    print(f"\nFound TVL data for {sum(v is not None for v in tvl_by_day)} days")
+    print(f"Found Borrowed data for {sum(v is not None for v in borrowed_by_day)} days")
     
     # Calculate daily totals (TVL + Borrowed)
     daily_totals = []
     print("\nDaily breakdown:")
     days_with_data = 0
     for day_num in range(30):
-        current_date = start_date + timedelta(days=day_num)
-        date_str = current_date.strftime('%Y-%m-%d')
-        
-        tvl = tvl_by_date.get(date_str, 0)
-        borrowed = borrowed_by_date.get(date_str, 0)
+        tvl = tvl_by_day[day_num] or 0
+        borrowed = borrowed_by_day[day_num] or 0
         total = tvl + borrowed
         
         if tvl > 0 or borrowed > 0:  # Only show days with data
+            date_str = (start_date + timedelta(days=day_num)).strftime('%Y-%m-%d')
             print(f"{date_str}: TVL=${tvl:,.2f} + Borrowed=${borrowed:,.2f} = ${total:,.2f}")
             days_with_data += 1
         
@@ -0,0 +1,90 @@
+"""
+Small on-disk cache for HTTP payloads, shared by the KPI scripts.
+
+Entries are keyed by URL: the raw response bytes are stored as
+`{hash}.json` next to a `{hash}.meta` sidecar holding the epoch time
+the entry was written. Entries older than the cache TTL are refetched.
+
+Set CACHE_CONTROL=no-cache in the environment to bypass cached reads
+(fresh responses are still written back to the cache).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import time
+from typing import Callable, TypeVar
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), ".cache")
+
+T = TypeVar("T")
+
+
+def cache_disabled() -> bool:
+    return "no-cache" in os.getenv("CACHE_CONTROL", "").lower()
+
+
+class FileCache:
+    def __init__(self, dir: str = DEFAULT_CACHE_DIR, ttl: float = 86400) -> None:
+        self.dir = dir
+        self.ttl = ttl
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        key = hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(self.dir, f"{key}.json"), os.path.join(self.dir, f"{key}.meta")
+
+    def get(self, url: str) -> bytes | None:
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                written_at = float(f.read().strip())
+            if time.time() - written_at > self.ttl:
+                return None
+            with open(body_path, "rb") as f:
+                return f.read()
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url: str, body: bytes) -> None:
+        body_path, meta_path = self._paths(url)
+        try:
+            os.makedirs(self.dir, exist_ok=True)
+            # Write body first, then the meta sidecar, each atomically. Temp names are
+            # unique so concurrent writers of the same key don't clobber each other.
+            for path, data in ((body_path, body), (meta_path, f"{time.time()}\n".encode("ascii"))):
+                with tempfile.NamedTemporaryFile(
+                    dir=self.dir, prefix=os.path.basename(path), suffix=".tmp", delete=False
+                ) as f:
+                    f.write(data)
+                try:
+                    os.replace(f.name, path)
+                except OSError:
+                    os.unlink(f.name)
+                    raise
+        except OSError as e:
+            # The cache is only an optimization; a failed write must not fail the fetch
+            print(f"Warning: could not cache {url}: {e}")
+
+    def get_or_fetch(
+        self, url: str, fetcher: Callable[[], bytes], parse: Callable[[bytes], T]
+    ) -> tuple[bytes, T]:
+        """Return (body, parse(body)), from the cache while the entry is fresh.
+
+        parse should raise ValueError on a body it rejects. A fetched body is
+        only cached once it parses, so a bad response is never served for
+        the rest of the TTL; a cached entry that no longer parses is refetched.
+        """
+        if not cache_disabled():
+            cached = self.get(url)
+            if cached is not None:
+                try:
+                    return cached, parse(cached)
+                except ValueError:
+                    pass
+        body = fetcher()
+        parsed = parse(body)
+        self.put(url, body)
+        return body, parsed
@@ -0,0 +1,163 @@
+"""
+Minimal keep-alive HTTP GET helper shared by the KPI scripts (stdlib only).
+
+Connections are kept open per (thread, scheme, host), so successive
+requests to the same API reuse one TCP+TLS session instead of paying a
+new handshake each time. Transient failures (429 and 5xx) are retried
+with exponential backoff, honouring Retry-After. Responses are requested
+gzip-compressed and transparently decompressed. JSON bodies are decoded
+(and encoded) with orjson when it is installed, falling back to the
+stdlib.
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import http.client
+import json
+import threading
+import time
+from typing import Any, Dict, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.parse import unquote, urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+USER_AGENT = "metric-script/1.0"
+MAX_REDIRECTS = 5
+MAX_RETRIES = 5
+BACKOFF_SECONDS = 0.5
+MAX_RETRY_AFTER_SECONDS = 60
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_local = threading.local()
+
+
+def _connections() -> Dict[Tuple[str, str], http.client.HTTPConnection]:
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    return conns
+
+
+def _new_connection(scheme: str, netloc: str, timeout: float) -> http.client.HTTPConnection:
+    # Honour HTTP(S)_PROXY / NO_PROXY like urlopen does, tunnelling through the proxy with
+    # CONNECT so the keep-alive connection is reused either way
+    target = urlsplit(f"{scheme}://{netloc}")
+    proxy = None if proxy_bypass(target.hostname or "") else getproxies().get(scheme)
+    host = netloc
+    tunnel_headers: Dict[str, str] = {}
+    if proxy is not None:
+        proxy_url = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+        host = proxy_url.hostname or ""
+        if proxy_url.port is not None:
+            host = f"{host}:{proxy_url.port}"
+        if proxy_url.username is not None:
+            creds = f"{unquote(proxy_url.username)}:{unquote(proxy_url.password or '')}"
+            token = base64.b64encode(creds.encode("utf-8")).decode("ascii")
+            tunnel_headers["Proxy-Authorization"] = f"Basic {token}"
+    cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+    conn = cls(host, timeout=timeout)
+    if proxy is not None:
+        conn.set_tunnel(target.hostname or "", target.port, headers=tunnel_headers)
+    return conn
+
+
+def _get_connection(scheme: str, netloc: str, timeout: float) -> http.client.HTTPConnection:
+    conns = _connections()
+    conn = conns.get((scheme, netloc))
+    if conn is None:
+        conn = conns[(scheme, netloc)] = _new_connection(scheme, netloc, timeout)
+    return conn
+
+
+def _drop_connection(scheme: str, netloc: str) -> None:
+    conn = _connections().pop((scheme, netloc), None)
+    if conn is not None:
+        conn.close()
+
+
+def _retry_delay(err: HTTPError, attempt: int) -> float:
+    retry_after = (err.headers.get("Retry-After") or "").strip() if err.headers else ""
+    if retry_after.isdigit():
+        return min(float(retry_after), MAX_RETRY_AFTER_SECONDS)
+    return BACKOFF_SECONDS * (2 ** attempt)
+
+
+def fetch_bytes(url: str, timeout: float = 30, headers: Dict[str, str] | None = None) -> bytes:
+    """GET `url` over a pooled connection and return the (decompressed) body.
+
+    Raises urllib.error.HTTPError on non-2xx responses, like urlopen, once
+    retries for transient statuses are exhausted.
+    """
+    attempt = 0
+    while True:
+        try:
+            return _fetch_bytes_once(url, timeout, headers)
+        except HTTPError as e:
+            if e.code not in RETRY_STATUSES or attempt >= MAX_RETRIES:
+                raise
+            time.sleep(_retry_delay(e, attempt))
+            attempt += 1
+
+
+def _fetch_bytes_once(url: str, timeout: float, headers: Dict[str, str] | None) -> bytes:
+    req_headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip", **(headers or {})}
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urlsplit(url)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        for attempt in range(2):
+            conn = _get_connection(parts.scheme, parts.netloc, timeout)
+            try:
+                conn.request("GET", path, headers=req_headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            except (OSError, http.client.HTTPException):
+                # A reused keep-alive socket may have been closed or gone stale
+                # (reset, timeout, empty status line); retry once on a fresh one
+                _drop_connection(parts.scheme, parts.netloc)
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                _drop_connection(parts.scheme, parts.netloc)
+                raise
+            break
+        if resp.will_close:
+            _drop_connection(parts.scheme, parts.netloc)
+        if resp.status in (301, 302, 303, 307, 308) and resp.getheader("Location"):
+            url = urljoin(url, resp.getheader("Location"))
+            continue
+        if not 200 <= resp.status < 300:
+            raise HTTPError(url, resp.status, resp.reason, resp.headers, None)
+        if (resp.getheader("Content-Encoding") or "").lower() == "gzip":
+            body = gzip.decompress(body)
+        return body
+    raise URLError("too many redirects")
+
+
+def decode_json(body: bytes) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # e.g. NaN/Infinity literals or a UTF-8 BOM; let the stdlib parser decide
+            pass
+    return json.loads(body)
+
+
+def encode_json(obj: Any) -> bytes:
+    """Compact UTF-8 JSON bytes for `obj`."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # e.g. integers beyond 64 bits; let the stdlib encoder decide
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
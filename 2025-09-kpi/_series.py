@@ -0,0 +1,60 @@
+"""
+Lookups over DefiLlama historical TVL series, shared by the KPI scripts.
+
+A series is a list of `{"date": <epoch seconds>, "tvl": ...}` rows.
+index_series turns it into parallel (timestamps, rows) lists ordered by
+timestamp, so a target date is found by bisection instead of a scan.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any, Dict, List, Tuple
+
+
+def extract_tvl_value(row: Dict[str, Any]) -> float | None:
+    # DefiLlama series may use 'tvl' or 'totalLiquidityUSD'
+    for key in ("tvl", "totalLiquidityUSD", "value"):
+        if key in row and row[key] is not None:
+            try:
+                return float(row[key])
+            except Exception:
+                return None
+    return None
+
+
+def index_series(series: List[Dict[str, Any]]) -> Tuple[List[int], List[Dict[str, Any]]]:
+    """Return parallel (timestamps, rows) for rows with a parseable 'date',
+    ordered by timestamp so lookups can bisect instead of scanning."""
+    pairs: List[Tuple[int, Dict[str, Any]]] = []
+    for row in series:
+        ts = row.get("date")
+        if ts is None:
+            continue
+        try:
+            pairs.append((int(ts), row))
+        except Exception:
+            continue
+    # DefiLlama series arrive sorted; only sort defensively if they don't
+    if any(pairs[i][0] > pairs[i + 1][0] for i in range(len(pairs) - 1)):
+        pairs.sort(key=lambda p: p[0])
+    return [ts for ts, _ in pairs], [row for _, row in pairs]
+
+
+def find_exact_entry(
+    ts_arr: List[int], rows: List[Dict[str, Any]], target_ts: int
+) -> Dict[str, Any] | None:
+    i = bisect_left(ts_arr, target_ts)
+    if i < len(ts_arr) and ts_arr[i] == target_ts:
+        return rows[i]
+    return None
+
+
+def nearest_entries(
+    ts_arr: List[int], rows: List[Dict[str, Any]], target_ts: int, k: int = 3
+) -> List[Tuple[int, Dict[str, Any]]]:
+    """Return up to k (ts, row) pairs closest to target_ts, nearest first."""
+    i = bisect_left(ts_arr, target_ts)
+    lo, hi = max(0, i - k), min(len(ts_arr), i + k)
+    window = sorted(range(lo, hi), key=lambda j: abs(ts_arr[j] - target_ts))
+    return [(ts_arr[j], rows[j]) for j in window[:k]]
@@ -11,12 +11,13 @@ Endpoint:
 
 from __future__ import annotations
 
-import json
 import os
-from collections import defaultdict
 from datetime import datetime, timezone, timedelta, date
+from functools import singledispatch
 from statistics import mean
-from urllib.request import urlopen, Request
+
+from _cache import FileCache
+from _http import decode_json, fetch_bytes
 
 
 ENDPOINT = (
@@ -25,46 +26,74 @@ ENDPOINT = (
 )
 DATA_DIR = os.path.dirname(__file__)
 RAW_PATH = os.path.join(DATA_DIR, "defillama_fees_base_daily_revenue_raw.json")
+# Daily revenue updates intra-day: refetch at most hourly
+CACHE = FileCache(ttl=3600)
 
 END_DATE = date(2025, 9, 26)  # inclusive
 WINDOW_DAYS = 30
 START_DATE = END_DATE - timedelta(days=WINDOW_DAYS - 1)
 
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_START_ORDINAL = START_DATE.toordinal()
+
+
+def parse_payload(body: bytes) -> dict:
+    payload = decode_json(body)
+    if not isinstance(payload, dict) or "totalDataChart" not in payload:
+        raise ValueError("Unexpected payload format: missing 'totalDataChart'")
+    return payload
+
 
 def fetch_and_save_raw() -> dict:
-    req = Request(ENDPOINT, headers={"User-Agent": "metric-script/1.0"})
-    with urlopen(req, timeout=30) as resp:
-        data = json.load(resp)
-    with open(RAW_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    return data
+    body, payload = CACHE.get_or_fetch(
+        ENDPOINT, lambda: fetch_bytes(ENDPOINT, timeout=30), parse_payload
+    )
+    # Persist raw payload as received for traceability, only once it has parsed
+    with open(RAW_PATH, "wb") as f:
+        f.write(body)
+    return payload
 
 
 def load_raw_from_disk() -> dict | None:
     if not os.path.exists(RAW_PATH):
         return None
-    with open(RAW_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(RAW_PATH, "rb") as f:
+        return parse_payload(f.read())
 
 
+@singledispatch
 def parse_utc_date(ts_val) -> date:
-    # Accept seconds since epoch (int/float/str) or ISO 8601 string
-    if isinstance(ts_val, (int, float)) or (isinstance(ts_val, str) and ts_val.isdigit()):
-        ts_seconds = int(float(ts_val))
-        return datetime.fromtimestamp(ts_seconds, tz=timezone.utc).date()
-    if isinstance(ts_val, str):
-        iso = ts_val.strip()
-        if iso.endswith("Z"):
-            iso = iso[:-1] + "+00:00"
-        dt = datetime.fromisoformat(iso)
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        else:
-            dt = dt.astimezone(timezone.utc)
-        return dt.date()
+    # Accept seconds since epoch (int/float/str) or ISO 8601 string;
+    # dispatch on the value's type to the handlers registered below
     raise ValueError(f"Unsupported timestamp: {ts_val!r}")
 
 
+@parse_utc_date.register
+def _(ts_val: int) -> date:
+    # UTC calendar day by integer arithmetic; no datetime/tz round trip
+    return date.fromordinal(_EPOCH_ORDINAL + ts_val // 86400)
+
+
+@parse_utc_date.register
+def _(ts_val: float) -> date:
+    return date.fromordinal(_EPOCH_ORDINAL + int(ts_val) // 86400)
+
+
+@parse_utc_date.register
+def _(ts_val: str) -> date:
+    if ts_val.isdigit():
+        return date.fromordinal(_EPOCH_ORDINAL + int(float(ts_val)) // 86400)
+    iso = ts_val.strip()
+    if iso.endswith("Z"):
+        iso = iso[:-1] + "+00:00"
+    dt = datetime.fromisoformat(iso)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    else:
+        dt = dt.astimezone(timezone.utc)
+    return dt.date()
+
+
 def main() -> None:
     try:
         payload = fetch_and_save_raw()
@@ -75,12 +104,11 @@ def main() -> None:
         print(f"Warning: network fetch failed ({e}); using cached raw data at {RAW_PATH}")
         payload = local
 
-    if not isinstance(payload, dict) or "totalDataChart" not in payload:
-        raise ValueError("Unexpected payload format: missing 'totalDataChart'")
-
     series = payload["totalDataChart"]
-    # Expect series as list of [timestamp, value]
-    by_day: dict[date, list[float]] = defaultdict(list)
+    # Expect series as list of [timestamp, value]; accumulate per-day sums and
+    # counts in fixed slots indexed by day offset from START_DATE
+    day_sums = [0.0] * WINDOW_DAYS
+    day_counts = [0] * WINDOW_DAYS
     for row in series:
         if not isinstance(row, (list, tuple)) or len(row) < 2:
             continue
@@ -95,21 +123,21 @@ def main() -> None:
             v = float(val)
         except Exception:
             continue
-        if START_DATE <= d <= END_DATE:
-            by_day[d].append(v)
+        idx = d.toordinal() - _START_ORDINAL
+        if 0 <= idx < WINDOW_DAYS:
+            day_sums[idx] += v
+            day_counts[idx] += 1
 
     # Build daily values for each date in the window
     daily_values: list[tuple[date, float]] = []
     missing_days: list[date] = []
-    cur = START_DATE
-    while cur <= END_DATE:
-        vals = by_day.get(cur, [])
-        if vals:
+    for idx in range(WINDOW_DAYS):
+        cur = date.fromordinal(_START_ORDINAL + idx)
+        if day_counts[idx]:
             # If multiple entries per day, average them
-            daily_values.append((cur, sum(vals) / len(vals)))
+            daily_values.append((cur, day_sums[idx] / day_counts[idx]))
         else:
             missing_days.append(cur)
-        cur += timedelta(days=1)
 
     if missing_days:
         print("Warning: missing daily data for these UTC dates:")
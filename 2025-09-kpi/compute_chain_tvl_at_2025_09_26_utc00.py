@@ -14,13 +14,16 @@ Raw JSON is saved per chain for traceability.
 from __future__ import annotations
 
 import argparse
-import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Any, Dict, List
 from urllib.parse import quote
-from urllib.request import urlopen, Request
+
+from _cache import FileCache
+from _http import decode_json, fetch_bytes
+from _series import extract_tvl_value, find_exact_entry, index_series, nearest_entries
 
 
 BASE_ENDPOINT = "https://api.llama.fi/v2/historicalChainTvl/"
@@ -29,47 +32,37 @@ DATA_DIR = os.path.dirname(__file__)
 TARGET_DT = datetime(2025, 9, 26, 0, 0, 0, tzinfo=timezone.utc)
 TARGET_TS = int(TARGET_DT.timestamp())
 
+# Historical TVL series: refetch at most once a day
+CACHE = FileCache(ttl=86400)
+MAX_WORKERS = 8
+
 
 def sanitize_filename_fragment(name: str) -> str:
     return "".join(c.lower() if c.isalnum() else "_" for c in name).strip("_")
 
 
+def parse_series(body: bytes) -> List[Dict[str, Any]]:
+    series = decode_json(body)
+    if not isinstance(series, list):
+        raise ValueError("expected a list of entries")
+    return series
+
+
 def fetch_chain_series(chain: str) -> List[Dict[str, Any]]:
     chain_path = quote(chain, safe="")
     endpoint = BASE_ENDPOINT + chain_path
-    req = Request(endpoint, headers={"User-Agent": "metric-script/1.0"})
-    with urlopen(req, timeout=60) as resp:
-        data = json.load(resp)
+    # Validated before it is cached or written, so one bad response cannot
+    # stand in for this chain until the cache entry expires
+    body, series = CACHE.get_or_fetch(
+        endpoint, lambda: fetch_bytes(endpoint, timeout=60), parse_series
+    )
     raw_path = os.path.join(
         DATA_DIR, f"defillama_chain_{sanitize_filename_fragment(chain)}_tvl_raw.json"
     )
-    with open(raw_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    return data
-
-
-def extract_tvl_value(row: Dict[str, Any]) -> float | None:
-    for key in ("tvl", "totalLiquidityUSD", "value"):
-        if key in row and row[key] is not None:
-            try:
-                return float(row[key])
-            except Exception:
-                return None
-    return None
-
-
-def find_exact_entry(series: List[Dict[str, Any]]) -> Dict[str, Any] | None:
-    for row in series:
-        ts = row.get("date")
-        if ts is None:
-            continue
-        try:
-            ts = int(ts)
-        except Exception:
-            continue
-        if ts == TARGET_TS:
-            return row
-    return None
+    # Persist raw payload as received, only once it has parsed
+    with open(raw_path, "wb") as f:
+        f.write(body)
+    return series
 
 
 def main(argv: List[str]) -> int:
@@ -77,40 +70,37 @@ def main(argv: List[str]) -> int:
     ap.add_argument("chains", nargs="+", help="DefiLlama chain names (e.g., Base, Solana, 'Hyperliquid L1')")
     args = ap.parse_args(argv)
 
+    # Fetch all chains concurrently, then report them in the order given
+    # (each distinct chain once, so repeated names don't race on the raw file)
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(args.chains))) as pool:
+        futures = {chain: pool.submit(fetch_chain_series, chain) for chain in dict.fromkeys(args.chains)}
+
     for chain in args.chains:
         print(f"\n=== {chain} ===")
         try:
-            series = fetch_chain_series(chain)
+            series = futures[chain].result()
+        except ValueError as e:
+            print(f"Unexpected payload for {chain}: {e}")
+            continue
         except Exception as e:
             print(f"Error fetching series for {chain}: {e}")
             continue
 
-        if not isinstance(series, list):
-            print(f"Unexpected payload for {chain}: expected a list of entries")
-            continue
-
-        match = find_exact_entry(series)
+        ts_arr, rows = index_series(series)
+        match = find_exact_entry(ts_arr, rows, TARGET_TS)
         if match is None:
             print("No exact entry at 2025-09-26 00:00:00Z found for this chain.")
             # Show nearest few for transparency
-            candidates = []
-            for row in series:
-                ts = row.get("date")
-                try:
-                    ts = int(ts)
-                except Exception:
-                    continue
-                candidates.append((abs(ts - TARGET_TS), ts, row))
+            candidates = nearest_entries(ts_arr, rows, TARGET_TS)
             if not candidates:
                 print("  Series is empty or malformed.")
                 continue
-            candidates.sort(key=lambda x: x[0])
-            for i, (_, ts, row) in enumerate(candidates[:3], start=1):
+            for i, (ts, row) in enumerate(candidates, start=1):
                 dt = datetime.fromtimestamp(ts, tz=timezone.utc)
                 tvl = extract_tvl_value(row)
                 print(f"  Candidate {i}: {dt.isoformat()} -> ${tvl:,.2f} (ts={ts})")
             # Proceed with the nearest for usability, but note mismatch
-            match = candidates[0][2]
+            match = candidates[0][1]
             print("Using nearest available candidate above.")
 
         ts = int(match.get("date"))
@@ -15,14 +15,16 @@ Notes:
 
 from __future__ import annotations
 
-import json
 import os
 import time
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
 from statistics import mean
-from typing import Any, Dict
-from urllib.request import Request, urlopen
+from typing import Any, Dict, Tuple
+
+from _cache import DEFAULT_CACHE_DIR, FileCache, cache_disabled
+from _http import decode_json, encode_json, fetch_bytes
 
 
 # Numeric day index endpoint, e.g., https://beaconcha.in/api/v1/ethstore/1706
@@ -33,20 +35,45 @@ RAW_PATH = os.path.join(DATA_DIR, "beaconchain_ethstore_raw.json")
 END_DATE = date(2025, 9, 25)  # inclusive
 WINDOW_DAYS = 30
 START_DATE = END_DATE - timedelta(days=WINDOW_DAYS - 1)
+_START_ORDINAL = START_DATE.toordinal()
+
+# Per-day responses: finalized days never change, so they are kept forever;
+# recent or not-yet-published days are refetched after an hour
+FINAL_CACHE = FileCache(os.path.join(DEFAULT_CACHE_DIR, "ethstore"), ttl=float("inf"))
+RECENT_CACHE = FileCache(os.path.join(DEFAULT_CACHE_DIR, "ethstore-recent"), ttl=3600)
+
+# Concurrent day fetches (transient 429s are retried by _http)
+FETCH_WORKERS = 8
+# Day ID search bounds; ID 0 is the first ETH.STORE day (Dec 2020)
+SEARCH_MIN_ID = 0
+SEARCH_MAX_ID = 4096
+# A failed probe cannot be told apart from an unpublished day, so it is
+# retried and then aborts discovery rather than steering the search
+PROBE_ATTEMPTS = 3
+PROBE_BACKOFF_SECONDS = 1.0
 
 
 def fetch_day_payload(day_id: int) -> Dict[str, Any]:
-    url = TEMPLATE.format(day=day_id)
-    headers = {"User-Agent": "metric-script/1.0", "Accept": "application/json"}
+    cache_key = url = TEMPLATE.format(day=day_id)
+    if not cache_disabled():
+        for cache in (FINAL_CACHE, RECENT_CACHE):
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return decode_json(cached)
+    headers = {"Accept": "application/json"}
     api_key = os.getenv("BEACONCHAIN_API_KEY")
     if api_key:
         # Support both header and query param styles for compatibility
         headers["X-API-KEY"] = api_key
         sep = "&" if "?" in url else "?"
         url = f"{url}{sep}apikey={api_key}"
-    req = Request(url, headers=headers)
-    with urlopen(req, timeout=30) as resp:
-        return json.load(resp)
+    # Pooled keep-alive connection: successive day IDs reuse one TLS session
+    body = fetch_bytes(url, timeout=30, headers=headers)
+    payload = decode_json(body)
+    d = first_day_end(payload)
+    finalized = d is not None and d < datetime.now(timezone.utc).date() - timedelta(days=1)
+    (FINAL_CACHE if finalized else RECENT_CACHE).put(cache_key, body)
+    return payload
 
 
 def extract_apr_and_day_end(payload: Dict[str, Any]) -> list[tuple[float, str]]:
@@ -72,9 +99,14 @@ def extract_apr_and_day_end(payload: Dict[str, Any]) -> list[tuple[float, str]]:
     return results
 
 
+@lru_cache(maxsize=256)
 def parse_utc_date_from_iso(iso_str: str) -> date | None:
     try:
         s = iso_str.strip()
+        # Fast path for the canonical ETH.STORE form YYYY-MM-DDTHH:MM:SSZ: the
+        # UTC date is the first ten characters, no datetime parse needed
+        if len(s) == 20 and s[4] == "-" and s[7] == "-" and s[10] == "T" and s[19] == "Z":
+            return date(int(s[0:4]), int(s[5:7]), int(s[8:10]))
         if s.endswith("Z"):
             s = s[:-1] + "+00:00"
         dt = datetime.fromisoformat(s)
@@ -87,97 +119,144 @@ def parse_utc_date_from_iso(iso_str: str) -> date | None:
         return None
 
 
-def discover_and_fetch_window() -> Dict[str, Any]:
-    """Discover numeric day IDs that fall within the UTC window by
-    scanning around a reasonable range, then fetch and return a map
-    from day_id to payload for those in-window entries.
+def observations(payload: Dict[str, Any]) -> list[tuple[float, date]]:
+    """(apr, day_end UTC date) observations in payload; unparseable dates are dropped."""
+    results: list[tuple[float, date]] = []
+    for apr, day_end in extract_apr_and_day_end(payload):
+        d = parse_utc_date_from_iso(day_end)
+        if d is not None:
+            results.append((apr, d))
+    return results
+
+
+def fetch_day_payload_or_error(day_id: int) -> Dict[str, Any]:
+    try:
+        return fetch_day_payload(day_id)
+    except Exception as e:
+        # Keep note of failures but continue
+        return {"error": str(e)}
+
+
+def probe_day_payload(day_id: int) -> Dict[str, Any]:
+    """fetch_day_payload for a bisection probe: retried, and raising if it
+    keeps failing. An error payload would read as "not published yet" and
+    silently shift the whole window."""
+    for attempt in range(PROBE_ATTEMPTS - 1):
+        try:
+            return fetch_day_payload(day_id)
+        except Exception:
+            time.sleep(PROBE_BACKOFF_SECONDS * (2 ** attempt))
+    return fetch_day_payload(day_id)
+
+
+def first_day_end(payload: Dict[str, Any]) -> date | None:
+    """UTC date of the first usable observation in a payload, if any."""
+    pairs = extract_apr_and_day_end(payload)
+    if not pairs:
+        return None
+    return parse_utc_date_from_iso(pairs[0][1])
+
+
+def find_last_id_on_or_before(
+    target: date, collected: Dict[str, Any], parsed: Dict[str, list[tuple[float, date]]]
+) -> int:
+    """Binary-search the largest day ID whose day_end falls on or before
+    `target` (UTC). Day IDs are a daily counter, so day_end is monotonic
+    in the ID; unpublished days (no observations) sort after every date.
+    A probe that fails outright raises instead of being read as unpublished.
+    Probed payloads and their observations are recorded in `collected`
+    and `parsed`."""
+    lo, hi = SEARCH_MIN_ID, SEARCH_MAX_ID
+    while lo < hi:
+        mid = (lo + hi) // 2
+        payload = probe_day_payload(mid)
+        collected[str(mid)] = payload
+        obs = parsed[str(mid)] = observations(payload)
+        d = obs[0][1] if obs else None
+        if d is not None and d <= target:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo - 1
+
+
+def discover_and_fetch_window() -> Tuple[Dict[str, Any], Dict[str, list[tuple[float, date]]]]:
+    """Discover numeric day IDs that fall within the UTC window, then
+    fetch and return maps from day_id to payload and to its parsed
+    (apr, day_end date) observations for those entries.
 
-    Strategy: start from an ID guess (e.g., 1700) and increment
-    until day_end exceeds END_DATE; collect entries where day_end
-    is within [START_DATE, END_DATE].
+    Strategy: binary-search the ID whose day_end is the last on or before
+    END_DATE (~12 probes), then fetch the WINDOW_DAYS IDs ending there
+    concurrently. Probe payloads and window-fetch errors are kept for
+    traceability.
     """
     collected: Dict[str, Any] = {}
-    # Conservative bounds to avoid excessive requests while covering the window
-    start_id = 1700
-    max_id = 1850
-    for day_id in range(start_id, max_id + 1):
-        try:
-            payload = fetch_day_payload(day_id)
-        except Exception as e:
-            # Keep note of failures but continue
-            collected[str(day_id)] = {"error": str(e)}
-            time.sleep(0.1)
-            continue
-        # Parse to see if it contains a usable day_end
-        pairs = extract_apr_and_day_end(payload)
-        # Choose the first if multiple
-        if not pairs:
-            # Store anyway for traceability
+    parsed: Dict[str, list[tuple[float, date]]] = {}
+    end_id = find_last_id_on_or_before(END_DATE, collected, parsed)
+    day_ids = [
+        day_id
+        for day_id in range(max(end_id - WINDOW_DAYS + 1, SEARCH_MIN_ID), end_id + 1)
+        if str(day_id) not in collected
+    ]
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        for day_id, payload in zip(day_ids, pool.map(fetch_day_payload_or_error, day_ids)):
             collected[str(day_id)] = payload
-            time.sleep(0.1)
-            continue
-        apr, day_end_str = pairs[0]
-        d = parse_utc_date_from_iso(day_end_str)
-        # Persist payload regardless
-        collected[str(day_id)] = payload
-        if d is None:
-            time.sleep(0.1)
-            continue
-        if d < START_DATE:
-            time.sleep(0.05)
-            continue
-        if d > END_DATE:
-            # We can break once we have passed the window and have collected enough
-            # to be safe; still keep this payload in the raw file.
-            break
-        time.sleep(0.05)
-    return collected
+            parsed[str(day_id)] = observations(payload)
+    order = sorted(collected, key=int)
+    return {k: collected[k] for k in order}, {k: parsed[k] for k in order}
 
 
 def load_raw() -> Dict[str, Any] | None:
     if not os.path.exists(RAW_PATH):
         return None
-    with open(RAW_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(RAW_PATH, "rb") as f:
+        return decode_json(f.read())
 
 
 def main() -> None:
     # Always try fresh fetch; if fails, fallback to cached raw
+    parsed = None
     try:
-        raw_window = discover_and_fetch_window()
-        with open(RAW_PATH, "w", encoding="utf-8") as f:
-            json.dump(raw_window, f, ensure_ascii=False, indent=2)
+        raw_window, parsed = discover_and_fetch_window()
+        # Compact bytes: the raw window is a machine-read artifact
+        with open(RAW_PATH, "wb") as f:
+            f.write(encode_json(raw_window))
     except Exception as e:
         cached = load_raw()
         if cached is None:
             raise RuntimeError(f"Failed to fetch data and no local raw file found: {e}")
         print(f"Warning: network fetch failed ({e}); using cached raw data at {RAW_PATH}")
-        raw_window = cached
+        raw_window, parsed = cached, None
+    if parsed is None:
+        # Raw-file fallback: observations were not parsed during the fetch
+        parsed = {key: observations(p) for key, p in raw_window.items() if isinstance(p, dict)}
 
     # Aggregate APR values by UTC date of day_end
-    by_day: dict[date, list[float]] = defaultdict(list)
-    for key, payload in raw_window.items():
-        if not isinstance(payload, dict):
-            continue
-        pairs = extract_apr_and_day_end(payload)
-        for apr, day_end_str in pairs:
-            d = parse_utc_date_from_iso(day_end_str)
-            if d is None:
-                continue
-            if START_DATE <= d <= END_DATE:
-                by_day[d].append(apr)
+    # (one slot per date, indexed by day offset from START_DATE)
+    by_day: list[list[float]] = [[] for _ in range(WINDOW_DAYS)]
+    for obs in parsed.values():
+        for apr, d in obs:
+            idx = d.toordinal() - _START_ORDINAL
+            if 0 <= idx < WINDOW_DAYS:
+                by_day[idx].append(apr)
+
+    # Both window edges must be present, or the day IDs were resolved to the
+    # wrong days and averaging would silently cover a shifted window
+    absent_edges = [
+        d.isoformat() for d, vals in ((START_DATE, by_day[0]), (END_DATE, by_day[-1])) if not vals
+    ]
+    if absent_edges:
+        raise RuntimeError(f"Fetched data does not cover window edge(s): {', '.join(absent_edges)}")
 
     # Build daily series across the full window (UTC dates)
     daily_values: list[tuple[date, float]] = []
     missing_days: list[date] = []
-    cur = START_DATE
-    while cur <= END_DATE:
-        vals = by_day.get(cur, [])
+    for idx, vals in enumerate(by_day):
+        cur = date.fromordinal(_START_ORDINAL + idx)
         if vals:
             daily_values.append((cur, mean(vals)))
         else:
             missing_days.append(cur)
-        cur += timedelta(days=1)
 
     if missing_days:
         print("Warning: missing daily data for these UTC dates (day_end):")
@@ -12,39 +12,49 @@ Endpoint:
 
 from __future__ import annotations
 
-import json
 import os
-from collections import defaultdict
 from datetime import datetime, timedelta, timezone, date
 from statistics import mean
-from urllib.request import urlopen, Request
+
+from _cache import FileCache
+from _http import decode_json, fetch_bytes
 
 
 ENDPOINT = "https://yields.llama.fi/chart/aa70268e-4b52-42bf-a116-608b370f9501"
 DATA_DIR = os.path.dirname(__file__)
 RAW_PATH = os.path.join(DATA_DIR, "defillama_yields_usdc_aavev3_eth_raw.json")
+# Yields update intra-day: refetch at most hourly
+CACHE = FileCache(ttl=3600)
 
 # Trailing window definition
 END_DATE = date(2025, 9, 25)  # inclusive
 WINDOW_DAYS = 30
 START_DATE = END_DATE - timedelta(days=WINDOW_DAYS - 1)
+_START_ORDINAL = START_DATE.toordinal()
+
+
+def parse_payload(body: bytes) -> dict:
+    payload = decode_json(body)
+    if not isinstance(payload, dict) or "data" not in payload:
+        raise ValueError("Unexpected payload format: missing 'data'")
+    return payload
 
 
 def fetch_and_save_raw() -> dict:
-    req = Request(ENDPOINT, headers={"User-Agent": "metric-script/1.0"})
-    with urlopen(req, timeout=30) as resp:
-        data = json.load(resp)
-    # Persist raw payload for traceability
-    with open(RAW_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    return data
+    body, payload = CACHE.get_or_fetch(
+        ENDPOINT, lambda: fetch_bytes(ENDPOINT, timeout=30), parse_payload
+    )
+    # Persist raw payload as received for traceability, only once it has parsed
+    with open(RAW_PATH, "wb") as f:
+        f.write(body)
+    return payload
 
 
 def load_raw_from_disk() -> dict | None:
     if not os.path.exists(RAW_PATH):
         return None
-    with open(RAW_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(RAW_PATH, "rb") as f:
+        return parse_payload(f.read())
 
 
 def parse_utc_date(ts_val) -> date:
@@ -79,12 +89,10 @@ def main() -> None:
         print(f"Warning: network fetch failed ({e}); using cached raw data at {RAW_PATH}")
         payload = local
 
-    if not isinstance(payload, dict) or "data" not in payload:
-        raise ValueError("Unexpected payload format: missing 'data'")
-
     points = payload["data"]
     # Bucket APY base values by UTC calendar date within the window
-    by_day: dict[date, list[float]] = defaultdict(list)
+    # (one slot per date, indexed by day offset from START_DATE)
+    by_day: list[list[float]] = [[] for _ in range(WINDOW_DAYS)]
 
     for pt in points:
         # Expected keys: timestamp (sec), apyBase, apyReward, apy, etc.
@@ -99,25 +107,24 @@ def main() -> None:
             d = parse_utc_date(ts)
         except Exception:
             continue
-        if START_DATE <= d <= END_DATE:
+        idx = d.toordinal() - _START_ORDINAL
+        if 0 <= idx < WINDOW_DAYS:
             # apyBase is expressed in percent units (e.g., 5.32 means 5.32%)
             try:
                 val = float(apy_base)
             except Exception:
                 continue
-            by_day[d].append(val)
+            by_day[idx].append(val)
 
     # Construct per-day values for each day in the window, ensuring coverage
     daily_values: list[tuple[date, float]] = []
     missing_days: list[date] = []
-    cur = START_DATE
-    while cur <= END_DATE:
-        vals = by_day.get(cur, [])
+    for idx, vals in enumerate(by_day):
+        cur = date.fromordinal(_START_ORDINAL + idx)
         if vals:
             daily_values.append((cur, mean(vals)))
         else:
             missing_days.append(cur)
-        cur += timedelta(days=1)
 
     if missing_days:
         # Report missing days; continue with available days but warn user
@@ -6,7 +6,7 @@
 # Output: unsigned integer CENTS = round_half_up(TWAP * 100).
 #
 # Artifacts saved:
-#  - artifacts/spotMeta.json
+#  - artifacts/spotMeta.json (when spotMeta is consulted, i.e. the coin id is not cached)
 #  - artifacts/candles.json (concatenated API candles)
 #  - artifacts/closes.csv (t_start_ms,t_start_iso,close,source[actual|filled])
 #  - artifacts/result.json (TWAP USD, CENTS, times)
@@ -20,28 +20,58 @@
 #    for the first included 1m candle (API candles are minute-aligned).
 #  - If >60 consecutive minutes are missing, we abort (not answerable yet).
 #  - Half-up rounding implemented as floor(x + 0.5) for x = TWAP*100 (>0).
+#  - spotMeta is cached for 24h and the resolved HYPE/USDC coin id indefinitely
+#    under .cache/ next to this script; --no-cache refetches both.
+#  - Closes are summed as exact scaled integers; Decimal is only used to
+#    format the reported TWAP.
 
 import argparse
 import json
 import math
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
-from decimal import Decimal, getcontext, ROUND_FLOOR
+from decimal import Decimal, getcontext
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Timestamp formatting and the exact TWAP rounding are shared with the metric_report CLI
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from metric_report.twap import grid_to_iso, ms_to_iso, round_half_up_cents, sum_prices  # noqa: E402
 
 API_URL = "https://api.hyperliquid.xyz/info"
 SESSION = requests.Session()
 SESSION.headers.update({"Content-Type": "application/json"})
-
-# High precision for Decimal arithmetic on sums/averages
+# Keep-alive pool sized for the concurrent candle fetches; Info API POSTs are
+# read-only, so transient 429/5xx responses are safe to retry with backoff
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=5,
+        backoff_factor=0.3,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=frozenset({"POST"}),
+        raise_on_status=False,
+    ),
+))
+
+# High precision for the reported Decimal TWAP
 getcontext().prec = 40
 
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+SPOT_META_TTL_S = 24 * 3600
+PAIR_NAME = "HYPE/USDC"
+
 MS_MINUTE = 60_000
 TWELVE_HOURS_MIN = 12 * 60
 WINDOW_MINUTES = 720  # 12h * 60
 MAX_CONSEC_MISSING = 60  # per rules
+FETCH_WORKERS = 4  # concurrent candleSnapshot sub-windows
 
 def parse_args():
     p = argparse.ArgumentParser(description="Compute 12h TWAP (HYPE/USDC spot) per Reality rules.")
@@ -54,6 +84,8 @@ def parse_args():
                    help="Directory to save artifacts (default: artifacts_twap_<timestamp>).")
     p.add_argument("--allow-early", action="store_true",
                    help="Compute even if we're before T_e + 5 minutes (for dry runs).")
+    p.add_argument("--no-cache", action="store_true",
+                   help="Ignore the cached spotMeta and coin id and refetch them.")
     p.add_argument("--verbose", action="store_true", help="Extra logging.")
     return p.parse_args()
 
@@ -68,25 +100,51 @@ def iso_to_ms(s: str) -> int:
         dt = dt.replace(tzinfo=timezone.utc)
     return int(dt.timestamp() * 1000)
 
-def ms_to_iso(ms: int) -> str:
-    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-
 def ceil_to_minute(ms: int) -> int:
     return ((ms + MS_MINUTE - 1) // MS_MINUTE) * MS_MINUTE
 
 def post_info(payload: dict):
-    r = SESSION.post(API_URL, data=json.dumps(payload), timeout=30)
+    r = SESSION.post(API_URL, json=payload, timeout=30)
     r.raise_for_status()
     return r.json()
 
-def fetch_spot_meta(artifacts_dir: str, verbose=False) -> dict:
-    body = {"type": "spotMeta"}
-    meta = post_info(body)
+def read_cache(name: str, max_age_s=None):
+    path = os.path.join(CACHE_DIR, name)
+    try:
+        if max_age_s is not None and time.time() - os.path.getmtime(path) > max_age_s:
+            return None
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_cache(name: str, obj) -> None:
+    # The cache only saves requests: failing to write it must not fail the run
+    path = os.path.join(CACHE_DIR, name)
+    tmp = f"{path}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump(obj, f, indent=2)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Warning: could not write cache {path}: {e}", file=sys.stderr)
+
+def fetch_spot_meta(artifacts_dir: str, verbose=False, use_cache=True) -> dict:
+    # spotMeta only changes when tokens are listed; reuse a copy up to a day old
+    meta = read_cache("spotMeta.json", max_age_s=SPOT_META_TTL_S) if use_cache else None
+    if meta is not None:
+        if verbose:
+            print("Using cached spotMeta.")
+    else:
+        body = {"type": "spotMeta"}
+        meta = post_info(body)
+        write_cache("spotMeta.json", meta)
+        if verbose:
+            print("Fetched spotMeta.")
     if artifacts_dir:
         with open(os.path.join(artifacts_dir, "spotMeta.json"), "w") as f:
             json.dump(meta, f, indent=2)
-    if verbose:
-        print("Fetched spotMeta.")
     return meta
 
 def resolve_hype_usdc_coin(meta: dict, verbose=False) -> str:
@@ -130,7 +188,44 @@ def resolve_hype_usdc_coin(meta: dict, verbose=False) -> str:
 
     raise RuntimeError("Could not resolve HYPE/USDC spot pair in spotMeta universe.")
 
+def resolve_coin(artifacts_dir: str, verbose=False, use_cache=True) -> str:
+    # A pair's index never changes once listed, so the resolved coin is cached indefinitely
+    coin_cache = (read_cache("coin_cache.json") or {}) if use_cache else {}
+    coin = coin_cache.get(PAIR_NAME)
+    if coin is None:
+        meta = fetch_spot_meta(artifacts_dir, verbose=verbose, use_cache=use_cache)
+        coin = resolve_hype_usdc_coin(meta, verbose=verbose)
+        write_cache("coin_cache.json", {**coin_cache, PAIR_NAME: coin})
+    elif verbose:
+        print(f"Using cached coin for {PAIR_NAME}: {coin}")
+    return coin
+
 def fetch_candles(coin: str, start_ms: int, end_ms: int, interval="1m", verbose=False):
+    """
+    Fetch candles covering [start_ms, end_ms).
+    The range is split into FETCH_WORKERS minute-aligned sub-windows that are paginated
+    concurrently; batches are merged in time order and de-duplicated on 't'.
+    """
+    span = -(-(end_ms - start_ms) // FETCH_WORKERS)
+    step = max(MS_MINUTE, ceil_to_minute(span))
+    bounds = [(s, min(s + step, end_ms)) for s in range(start_ms, end_ms, step)]
+    if not bounds:
+        return []
+
+    with ThreadPoolExecutor(max_workers=len(bounds)) as pool:
+        batches = list(pool.map(
+            lambda b: fetch_candle_range(coin, b[0], b[1], interval=interval, verbose=verbose),
+            bounds,
+        ))
+
+    # Adjacent sub-windows may both return the boundary candle
+    by_start = {}
+    for batch in batches:
+        for c in batch:
+            by_start.setdefault(int(c["t"]), c)
+    return [by_start[t] for t in sorted(by_start)]
+
+def fetch_candle_range(coin: str, start_ms: int, end_ms: int, interval="1m", verbose=False):
     """
     Paginate candleSnapshot until we cover [start_ms, end_ms).
     The Info endpoint pages time-ranged responses (~500 items per page). We advance using last 'T'.
@@ -174,65 +269,55 @@ def fetch_candles(coin: str, start_ms: int, end_ms: int, interval="1m", verbose=
 
     return all_candles
 
-def fetch_prev_minute_close(coin: str, first_minute_ms: int):
-    """
-    Get the close of the minute immediately preceding first_minute_ms, if available.
-    """
-    start = first_minute_ms - MS_MINUTE
-    end = first_minute_ms
-    body = {"type": "candleSnapshot", "req": {"coin": coin, "interval": "1m", "startTime": start, "endTime": end}}
-    batch = post_info(body)
-    if isinstance(batch, list) and batch:
-        # Expect exactly one candle
-        return Decimal(batch[-1]["c"])
-    return None
-
-def build_minute_series(candles: list, start_ms: int, end_ms: int, prev_close: Decimal, verbose=False):
+def build_minute_series(candles: list, start_ms: int, end_ms: int, prev_close: str, verbose=False):
     """
     Build a 1-minute CLOSE series on the exact minute grid [start_ms, end_ms) with step=60_000.
     Fill missing minutes by carry-forward (previous close). If >60 consecutive missing, abort.
     """
-    # Map candles by their start time 't'
-    idx = {}
+    # Place candle closes straight into a preallocated slot per grid minute
+    grid = range(start_ms, end_ms, MS_MINUTE)
+    slots = [None] * len(grid)
     for c in candles:
         # Only keep 1m for safety; ignore any off-interval items
         if c.get("i") == "1m":
-            t = int(c["t"])
-            idx[t] = Decimal(c["c"])
+            offset, rem = divmod(int(c["t"]) - start_ms, MS_MINUTE)
+            if rem == 0 and 0 <= offset < len(slots):
+                slots[offset] = c["c"]
 
-    grid = list(range(start_ms, end_ms, MS_MINUTE))
-    closes = []
-    sources = []
-    missing_streak = 0
-    last_close = prev_close
-
-    for t in grid:
-        if t in idx:
-            px = idx[t]
-            closes.append(px)
-            sources.append("actual")
-            missing_streak = 0
-            last_close = px
-        else:
-            # Missing minute
-            missing_streak += 1
-            if last_close is None:
-                # Try to prevent edge case: no previous close at very first minute
-                raise RuntimeError("First minute missing and no previous close available for carry-forward.")
-            if missing_streak > MAX_CONSEC_MISSING:
-                raise RuntimeError(f"> {MAX_CONSEC_MISSING} consecutive minutes missing; not answerable yet.")
-            closes.append(last_close)
-            sources.append("filled")
+    closes, sources = fill_forward(slots, prev_close, MAX_CONSEC_MISSING)
 
     if len(closes) != WINDOW_MINUTES:
         raise RuntimeError(f"Expected {WINDOW_MINUTES} minutes, got {len(closes)}.")
 
     return grid, closes, sources
 
-def round_half_up_cents(value_usd: Decimal) -> int:
-    # Implements floor(x + 0.5) for x > 0, where x = TWAP * 100
-    x = (value_usd * Decimal(100))
-    return int((x + Decimal("0.5")).to_integral_value(rounding=ROUND_FLOOR))
+def fill_forward(slots: list, prev_close, max_missing: int):
+    """
+    Carry the last close forward over empty slots; returns (closes, sources) of the same length.
+    Aborts if the first slot is empty with no prev_close, or on > max_missing consecutive gaps.
+    """
+    n = len(slots)
+    closes = [None] * n
+    sources = ["actual"] * n
+    missing_streak = 0
+    last_close = prev_close
+
+    for i, raw_close in enumerate(slots):
+        if raw_close is not None:
+            closes[i] = last_close = raw_close
+            missing_streak = 0
+            continue
+        # Missing minute
+        missing_streak += 1
+        if last_close is None:
+            # Try to prevent edge case: no previous close at very first minute
+            raise RuntimeError("First minute missing and no previous close available for carry-forward.")
+        if missing_streak > max_missing:
+            raise RuntimeError(f"> {max_missing} consecutive minutes missing; not answerable yet.")
+        closes[i] = last_close
+        sources[i] = "filled"
+
+    return closes, sources
 
 def main():
     args = parse_args()
@@ -272,14 +357,14 @@ def main():
         print(f"T_e = {ms_to_iso(Te)} ({Te})")
 
     # Resolve HYPE/USDC spot coin identifier
-    meta = fetch_spot_meta(artifacts_dir, verbose=args.verbose)
-    coin = resolve_hype_usdc_coin(meta, verbose=args.verbose)
+    coin = resolve_coin(artifacts_dir, verbose=args.verbose, use_cache=not args.no_cache)
 
-    # Fetch a previous-minute close for carry-forward if first minute is missing
-    prev_close = fetch_prev_minute_close(coin, Ts)
-
-    # Fetch candles over [Ts, Te)
-    candles = fetch_candles(coin, Ts, Te, interval="1m", verbose=args.verbose)
+    # Fetch candles over [Ts, Te), starting one minute early so the previous-minute close
+    # (carry-forward source if the first minute is missing) arrives with the first page
+    fetched = fetch_candles(coin, Ts - MS_MINUTE, Te, interval="1m", verbose=args.verbose)
+    candles = [c for c in fetched if int(c["t"]) >= Ts]
+    prev_candles = [c for c in fetched if int(c["t"]) < Ts]
+    prev_close = prev_candles[-1]["c"] if prev_candles else None
 
     # Save raw candles
     with open(os.path.join(artifacts_dir, "candles.json"), "w") as f:
@@ -290,20 +375,21 @@ def main():
 
     # Save closes CSV
     csv_path = os.path.join(artifacts_dir, "closes.csv")
+    rows = "".join(
+        f"{t},{iso},{px},{src}\n" for t, iso, px, src in zip(grid, grid_to_iso(grid), closes, sources)
+    )
     with open(csv_path, "w") as f:
-        f.write("t_start_ms,t_start_iso,close,source\n")
-        for t, px, src in zip(grid, closes, sources):
-            f.write(f"{t},{ms_to_iso(t)},{str(px)},{src}\n")
+        f.write("t_start_ms,t_start_iso,close,source\n" + rows)
 
     # Compute simple average TWAP
-    total = sum(closes, start=Decimal(0))
-    N = Decimal(len(closes))
-    if len(closes) != WINDOW_MINUTES:
-        raise RuntimeError(f"Expected {WINDOW_MINUTES} minutes, got {len(closes)}.")
-    twap = total / N
+    total, decimals = sum_prices(closes)
+    N = len(closes)
+    if N != WINDOW_MINUTES:
+        raise RuntimeError(f"Expected {WINDOW_MINUTES} minutes, got {N}.")
+    twap = Decimal(total).scaleb(-decimals) / Decimal(N)
 
     # Final integer cents with half-up rounding
-    cents = round_half_up_cents(twap)
+    cents = round_half_up_cents(total, decimals, N)
 
     # Save result.json
     result = {
@@ -315,7 +401,7 @@ def main():
         "observation_end_iso": ms_to_iso(Te),
         "earliest_answerable_ms": earliest_answerable,
         "earliest_answerable_iso": ms_to_iso(earliest_answerable),
-        "n_minutes": int(N),
+        "n_minutes": N,
         "twap_usd": str(twap),
         "cents_uint": cents,
         "coin": coin,
@@ -1,25 +1,52 @@
 from __future__ import annotations
 
 import argparse
+import base64
 import csv
+import http.client
 import json
+import os
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime, timezone, timedelta
-from decimal import Decimal, getcontext, ROUND_FLOOR
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timezone
+from decimal import Decimal, getcontext
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+from urllib.parse import SplitResult, unquote, urlsplit
+from urllib.request import getproxies, proxy_bypass
+
+from metric_report.twap import (
+    MS_MINUTE,
+    grid_to_iso,
+    ms_to_iso,
+    round_half_up_cents,
+    sum_prices,
+)
+
+try:
+    import orjson
+except ImportError:  # optional speedup for decoding responses and writing artifacts
+    orjson = None  # type: ignore[assignment]
 
 
 # Arithmetic precision for Decimal operations
 getcontext().prec = 40
 
 API_URL = "https://api.hyperliquid.xyz/info"
-MS_MINUTE = 60_000
 WINDOW_MINUTES = 12 * 60  # 720
 MAX_CONSEC_MISSING = 60
+FETCH_WORKERS = 4  # concurrent candleSnapshot sub-windows
+# Transient Info API responses are retried with exponential backoff, honouring Retry-After
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.5
+MAX_RETRY_AFTER_SECONDS = 60
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# One keep-alive connection per thread: paged Info API calls share a TCP+TLS session
+_local = threading.local()
 
 
 @dataclass(frozen=True)
@@ -45,10 +72,6 @@ def iso_to_ms(s: str) -> int:
     return int(dt.timestamp() * 1000)
 
 
-def ms_to_iso(ms: int) -> str:
-    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-
-
 def ceil_to_minute(ms: int) -> int:
     return ((ms + MS_MINUTE - 1) // MS_MINUTE) * MS_MINUTE
 
@@ -67,18 +90,104 @@ def compute_anchors(decision_ms: int) -> Anchors:
     )
 
 
+def _new_connection(url: SplitResult) -> http.client.HTTPConnection:
+    # Honour HTTP(S)_PROXY / NO_PROXY like urllib does, tunnelling through the proxy with
+    # CONNECT so the keep-alive connection is reused either way
+    proxy = None if proxy_bypass(url.hostname or "") else getproxies().get(url.scheme)
+    host = url.netloc
+    tunnel_headers: Dict[str, str] = {}
+    if proxy is not None:
+        proxy_url = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+        host = proxy_url.hostname or ""
+        if proxy_url.port is not None:
+            host = f"{host}:{proxy_url.port}"
+        if proxy_url.username is not None:
+            creds = f"{unquote(proxy_url.username)}:{unquote(proxy_url.password or '')}"
+            token = base64.b64encode(creds.encode("utf-8")).decode("ascii")
+            tunnel_headers["Proxy-Authorization"] = f"Basic {token}"
+    conn: http.client.HTTPConnection
+    if url.scheme == "https":
+        conn = http.client.HTTPSConnection(host, timeout=30)
+    else:
+        conn = http.client.HTTPConnection(host, timeout=30)
+    if proxy is not None:
+        conn.set_tunnel(url.hostname or "", url.port, headers=tunnel_headers)
+    return conn
+
+
+def _post_once(data: bytes) -> Tuple[http.client.HTTPResponse, bytes]:
+    url = urlsplit(API_URL)
+    conn: Optional[http.client.HTTPConnection] = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _new_connection(url)
+        _local.conn = conn
+    try:
+        conn.request("POST", url.path, body=data, headers={"Content-Type": "application/json"})
+        resp = conn.getresponse()
+        return resp, resp.read()
+    except BaseException:
+        conn.close()
+        _local.conn = None
+        raise
+
+
+def _retry_delay(resp: http.client.HTTPResponse, attempt: int) -> float:
+    retry_after = (resp.getheader("Retry-After") or "").strip()
+    if retry_after.isdigit():
+        return min(float(retry_after), MAX_RETRY_AFTER_SECONDS)
+    return BACKOFF_SECONDS * (2**attempt)
+
+
 def post_info(payload: Dict[str, Any]) -> Any:
     data = json.dumps(payload).encode("utf-8")
-    req = Request(API_URL, data=data, headers={"Content-Type": "application/json"}, method="POST")
-    with urlopen(req, timeout=30) as resp:
-        return json.loads(resp.read().decode("utf-8"))
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            resp, body = _post_once(data)
+        except (http.client.HTTPException, OSError):
+            # The server may have dropped an idle keep-alive socket: reconnect once
+            try:
+                resp, body = _post_once(data)
+            except (http.client.HTTPException, OSError) as e:
+                raise URLError(e) from e
+        if resp.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            break
+        # Rate limited or a transient server error: the body has been read, so the
+        # keep-alive connection stays open across the backoff
+        time.sleep(_retry_delay(resp, attempt))
+    if not 200 <= resp.status < 300:
+        raise HTTPError(API_URL, resp.status, resp.reason, resp.headers, None)
+    return decode_json(body)
+
+
+def decode_json(body: bytes) -> Any:
+    """Parse a JSON response body, via orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN/Infinity literals or a UTF-8 BOM; let the stdlib parser decide
+    return json.loads(body)
+
+
+def write_json(path: str, obj: Any) -> None:
+    """Write a bulk raw artifact as 2-space indented JSON, via orjson when it is installed."""
+    if orjson is not None:
+        try:
+            data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers beyond 64 bits; let the stdlib encoder decide
+        else:
+            with open(path, "wb") as f:
+                f.write(data)
+            return
+    with open(path, "w") as f:
+        json.dump(obj, f, indent=2)
 
 
 def fetch_spot_meta(artifacts_dir: str | None) -> Dict[str, Any]:
     meta = post_info({"type": "spotMeta"})
     if artifacts_dir is not None:
-        with open(f"{artifacts_dir}/spotMeta.json", "w") as f:
-            json.dump(meta, f, indent=2)
+        write_json(f"{artifacts_dir}/spotMeta.json", meta)
     return meta
 
 
@@ -120,6 +229,24 @@ def resolve_hype_usdc_coin(meta: Dict[str, Any]) -> str:
 
 
 def fetch_candles_paged(coin: str, start_ms: int, end_ms: int) -> List[Dict[str, Any]]:
+    # Split [start_ms, end_ms) into FETCH_WORKERS minute-aligned sub-windows and page
+    # through them concurrently; batches are merged in time order and de-duplicated on 't'
+    step = max(MS_MINUTE, ceil_to_minute(-(-(end_ms - start_ms) // FETCH_WORKERS)))
+    bounds = [(s, min(s + step, end_ms)) for s in range(start_ms, end_ms, step)]
+    if not bounds:
+        return []
+    with ThreadPoolExecutor(max_workers=len(bounds)) as pool:
+        batches = list(pool.map(lambda b: fetch_candle_range(coin, b[0], b[1]), bounds))
+
+    # Adjacent sub-windows may both return the boundary candle (endTime is inclusive)
+    by_start: Dict[int, Dict[str, Any]] = {}
+    for batch in batches:
+        for c in batch:
+            by_start.setdefault(int(c["t"]), c)
+    return [by_start[t] for t in sorted(by_start)]
+
+
+def fetch_candle_range(coin: str, start_ms: int, end_ms: int) -> List[Dict[str, Any]]:
     all_items: List[Dict[str, Any]] = []
     cursor = start_ms
     last_progress = None
@@ -147,7 +274,7 @@ def fetch_candles_paged(coin: str, start_ms: int, end_ms: int) -> List[Dict[str,
     return all_items
 
 
-def fetch_prev_minute_close(coin: str, first_minute_ms: int) -> Optional[Decimal]:
+def fetch_prev_minute_close(coin: str, first_minute_ms: int) -> Optional[str]:
     start = first_minute_ms - MS_MINUTE
     end = first_minute_ms
     body = {
@@ -156,44 +283,26 @@ def fetch_prev_minute_close(coin: str, first_minute_ms: int) -> Optional[Decimal
     }
     batch = post_info(body)
     if isinstance(batch, list) and batch:
-        return Decimal(str(batch[-1]["c"]))
+        return str(batch[-1]["c"])
     return None
 
 
 def build_minute_series(
-    candles: List[Dict[str, Any]], start_ms: int, end_ms: int, prev_close: Optional[Decimal]
-) -> Tuple[List[int], List[Decimal], List[str]]:
-    # Index candles by their start time 't' for 1m interval only
-    by_start: Dict[int, Decimal] = {}
+    candles: List[Dict[str, Any]], start_ms: int, end_ms: int, prev_close: Optional[str]
+) -> Tuple[range, List[str], List[str]]:
+    # Place 1m candle closes straight into a pre-sized slot per grid minute; closes stay
+    # as the API's decimal strings and are summed exactly by sum_prices
+    grid = range(start_ms, end_ms, MS_MINUTE)
+    n = len(grid)
+    slots: List[Optional[str]] = [None] * n
+    ms_minute = MS_MINUTE  # local: read once per candle
     for c in candles:
         if c.get("i") == "1m" and "t" in c and "c" in c:
-            by_start[int(c["t"])] = Decimal(str(c["c"]))
-
-    grid = list(range(start_ms, end_ms, MS_MINUTE))
-    closes: List[Decimal] = []
-    sources: List[str] = []
-    missing_streak = 0
-    last_close = prev_close
+            offset, rem = divmod(int(c["t"]) - start_ms, ms_minute)
+            if rem == 0 and 0 <= offset < n:
+                slots[offset] = str(c["c"])
 
-    for t in grid:
-        px = by_start.get(t)
-        if px is not None:
-            closes.append(px)
-            sources.append("actual")
-            missing_streak = 0
-            last_close = px
-        else:
-            missing_streak += 1
-            if last_close is None:
-                raise RuntimeError(
-                    "First minute missing and no previous close available for carry-forward."
-                )
-            if missing_streak > MAX_CONSEC_MISSING:
-                raise RuntimeError(
-                    f"> {MAX_CONSEC_MISSING} consecutive minutes missing; not answerable yet."
-                )
-            closes.append(last_close)
-            sources.append("filled")
+    closes, sources = fill_forward(slots, prev_close, MAX_CONSEC_MISSING)
 
     if len(closes) != WINDOW_MINUTES:
         raise RuntimeError(f"Expected {WINDOW_MINUTES} minutes, got {len(closes)}")
@@ -201,25 +310,50 @@ def build_minute_series(
     return grid, closes, sources
 
 
-def round_half_up_cents(value_usd: Decimal) -> int:
-    x = value_usd * Decimal(100)
-    return int((x + Decimal("0.5")).to_integral_value(rounding=ROUND_FLOOR))
+def fill_forward(
+    slots: List[Optional[str]], prev_close: Optional[str], max_missing: int
+) -> Tuple[List[str], List[str]]:
+    """Carry the last close forward over empty slots; returns (closes, sources).
+
+    Raises RuntimeError if the first slot is empty with no prev_close, or on more
+    than max_missing consecutive empty slots.
+    """
+    n = len(slots)
+    closes: List[str] = [""] * n
+    sources: List[str] = ["actual"] * n
+    missing_streak = 0
+    last_close = prev_close
+
+    for i, px in enumerate(slots):
+        if px is not None:
+            closes[i] = last_close = px
+            missing_streak = 0
+            continue
+        missing_streak += 1
+        if last_close is None:
+            raise RuntimeError(
+                "First minute missing and no previous close available for carry-forward."
+            )
+        if missing_streak > max_missing:
+            raise RuntimeError(f"> {max_missing} consecutive minutes missing; not answerable yet.")
+        closes[i] = last_close
+        sources[i] = "filled"
+
+    return closes, sources
 
 
 def write_candles_artifact(artifacts_dir: str, items: List[Dict[str, Any]]) -> None:
-    with open(f"{artifacts_dir}/candles.json", "w") as f:
-        json.dump(items, f, indent=2)
+    write_json(f"{artifacts_dir}/candles.json", items)
 
 
 def write_closes_csv(
-    artifacts_dir: str, grid: List[int], closes: List[Decimal], sources: List[str]
+    artifacts_dir: str, grid: range, closes: List[str], sources: List[str]
 ) -> None:
     path = f"{artifacts_dir}/closes.csv"
     with open(path, "w", newline="") as f:
         writer = csv.writer(f)
         writer.writerow(["t_start_ms", "t_start_iso", "close", "source"])
-        for t, px, src in zip(grid, closes, sources):
-            writer.writerow([t, ms_to_iso(t), str(px), src])
+        writer.writerows(zip(grid, grid_to_iso(grid), closes, sources))
 
 
 def write_result_json(artifacts_dir: str, anchors: Anchors, coin: str, twap: Decimal, cents: int) -> None:
@@ -237,6 +371,8 @@ def write_result_json(artifacts_dir: str, anchors: Anchors, coin: str, twap: Dec
         "cents_uint": cents,
         "coin": coin,
     }
+    # Human-facing: stdlib json keeps the previous bytes (orjson output is equivalent
+    # JSON but leaves non-ASCII text unescaped and formats floats differently)
     with open(f"{artifacts_dir}/result.json", "w") as f:
         json.dump(data, f, indent=2)
 
@@ -269,6 +405,11 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         action="store_true",
         help="Enable verbose logging to stderr",
     )
+    p.add_argument(
+        "--no-raw-artifacts",
+        action="store_true",
+        help="Skip writing spotMeta.json and candles.json (closes.csv and result.json are kept)",
+    )
     p.add_argument(
         "--allow-early",
         action="store_true",
@@ -283,8 +424,6 @@ def main(argv: Optional[List[str]] = None) -> int:
     artifacts_dir: str = args.artifacts
     # Ensure dir exists
     try:
-        import os
-
         os.makedirs(artifacts_dir, exist_ok=True)
     except Exception as e:
         print(f"Error creating artifacts dir: {e}", file=sys.stderr)
@@ -309,7 +448,8 @@ def main(argv: Optional[List[str]] = None) -> int:
 
     try:
         # spotMeta
-        meta = fetch_spot_meta(artifacts_dir)
+        raw_dir = None if args.no_raw_artifacts else artifacts_dir
+        meta = fetch_spot_meta(raw_dir)
         coin = resolve_hype_usdc_coin(meta)
 
         # Optional seed close for first-minute missing case
@@ -317,18 +457,19 @@ def main(argv: Optional[List[str]] = None) -> int:
 
         # Paged candle fetch over [Ts, Te)
         candles = fetch_candles_paged(coin, anchors.start_ms, anchors.end_ms)
-        write_candles_artifact(artifacts_dir, candles)
+        if raw_dir is not None:
+            write_candles_artifact(raw_dir, candles)
 
         # Build grid and closes with carry-forward
         grid, closes, sources = build_minute_series(candles, anchors.start_ms, anchors.end_ms, prev_close)
         write_closes_csv(artifacts_dir, grid, closes, sources)
 
-        # TWAP
-        total = sum(closes, start=Decimal(0))
+        # TWAP: exact integer sum; Decimal only renders the reported value
+        total, decimals = sum_prices(closes)
         if len(closes) != WINDOW_MINUTES:
             raise RuntimeError(f"Expected {WINDOW_MINUTES} minutes, got {len(closes)}")
-        twap = total / Decimal(len(closes))
-        cents = round_half_up_cents(twap)
+        twap = Decimal(total).scaleb(-decimals) / Decimal(len(closes))
+        cents = round_half_up_cents(total, decimals, len(closes))
 
         write_result_json(artifacts_dir, anchors, coin, twap, cents)
 
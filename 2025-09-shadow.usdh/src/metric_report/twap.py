@@ -0,0 +1,73 @@
+"""Timestamp formatting and exact TWAP arithmetic shared by the CLI and compute_hype_twap.py.
+
+Prices stay exact: API decimal strings are summed as scaled integers and the cents
+are rounded half-up in integer arithmetic, so both entry points round identically.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+
+MS_MINUTE = 60_000
+MS_DAY = 86_400_000
+UTC_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def ms_to_iso(ms: int) -> str:
+    # Exact offset from the epoch: no float seconds or timestamp conversion
+    return (UTC_EPOCH + timedelta(milliseconds=ms)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def grid_to_iso(grid: Iterable[int]) -> List[str]:
+    """ms_to_iso for each timestamp of a grid: each UTC date is formatted once and the
+    time of day is derived with integer arithmetic."""
+    day_prefixes: Dict[int, str] = {}
+    out: List[str] = []
+    append = out.append
+    ms_day, ms_minute = MS_DAY, MS_MINUTE  # locals: read once per grid minute
+    for t in grid:
+        day, ms_of_day = divmod(t, ms_day)
+        prefix = day_prefixes.get(day)
+        if prefix is None:
+            prefix = day_prefixes[day] = ms_to_iso(day * ms_day)[:11]  # "YYYY-MM-DDT"
+        minutes, ms_of_minute = divmod(ms_of_day, ms_minute)
+        append(f"{prefix}{minutes // 60:02d}:{minutes % 60:02d}:{ms_of_minute // 1000:02d}Z")
+    return out
+
+
+def parse_price(raw: str) -> Tuple[int, int]:
+    """Split a decimal price string into an exact (mantissa, decimals) pair.
+
+    e.g. "42.4918" -> (424918, 4)
+    """
+    s = raw.strip()
+    if "e" not in s.lower():
+        whole, _, frac = s.partition(".")
+        return int(whole + frac), len(frac)
+    # Exponent notation is unusual; let Decimal normalise it
+    sign, digits, exp = Decimal(s).as_tuple()
+    mantissa = int("".join(map(str, digits)) or "0") * (-1 if sign else 1)
+    if not isinstance(exp, int):
+        raise ValueError(f"Non-finite price: {raw!r}")
+    if exp >= 0:
+        return mantissa * 10**exp, 0
+    return mantissa, -exp
+
+
+def sum_prices(closes: List[str]) -> Tuple[int, int]:
+    """Exact sum of decimal price strings as (total, decimals): sum = total / 10**decimals."""
+    # Sum mantissas per decimal precision, then rescale each group once
+    by_decimals: Dict[int, int] = {}
+    for px in closes:
+        m, d = parse_price(px)
+        by_decimals[d] = by_decimals.get(d, 0) + m
+    decimals = max(by_decimals, default=0)
+    return sum(m * 10 ** (decimals - d) for d, m in by_decimals.items()), decimals
+
+
+def round_half_up_cents(total: int, decimals: int, n: int) -> int:
+    # floor(x + 0.5) for x = 100 * TWAP = 100 * total / (n * 10**decimals), in exact integers
+    scale: int = n * 10**decimals
+    return (200 * total + scale) // (2 * scale)
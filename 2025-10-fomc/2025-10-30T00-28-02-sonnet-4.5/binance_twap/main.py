@@ -6,15 +6,24 @@ Computes the 12-hour TWAP of Binance spot prices (BTCUSDT or ETHUSDT) using 1-mi
 """
 
 import argparse
+import gzip
 import json
 import sys
 import time
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from decimal import ROUND_HALF_UP, Decimal
+from operator import itemgetter
 from pathlib import Path
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional speedup for decoding responses and writing artifacts
+    orjson = None  # type: ignore[assignment]
 
 # Constants from spec
 WINDOW_START_ISO = "2025-10-29T18:00:00Z"
@@ -22,8 +31,10 @@ WINDOW_END_OPEN_ISO = "2025-10-30T05:59:00Z"
 WINDOW_START_MS = 1761760800000
 WINDOW_END_OPEN_MS = 1761803940000
 INTERVAL_MS = 60000
+UTC_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
 EXPECTED_FINAL_COUNT = 720
 ALLOWED_SYMBOLS = {"BTCUSDT", "ETHUSDT"}
+RESULT_QUANTUM = Decimal("1")  # result_integer_times_100 is rounded to a whole number
 DEFAULT_EXCHANGE_BASE = "https://api.binance.com"
 FALLBACK_EXCHANGES = [
     "https://api-gcp.binance.com",
@@ -31,6 +42,24 @@ FALLBACK_EXCHANGES = [
     "https://api2.binance.com",
 ]
 
+# Per-exchange retries: exponential backoff with jitter, honouring Retry-After on 429s.
+# Retries run inside the adapter, so they reuse the pooled keep-alive connection.
+FETCH_RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    backoff_jitter=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET"}),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+# Shared keep-alive session: retries and fallback hosts reuse pooled TLS connections
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=FETCH_RETRY)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+
 
 def parse_args() -> argparse.Namespace:
     """Parse command-line arguments."""
@@ -52,7 +81,8 @@ OUTPUT:
   • Final (complete): Prints only the result integer on the first line
   • Temporary/error:  Prints the result or 'null', then a status line
   • JSON diagnostics: Written to --out-json (default: ./twap_result.json)
-  • Raw klines:       Written to --raw-out (default: ./klines_raw.json)
+  • Raw klines:       Written to --raw-out (default: ./klines_raw.json);
+                      a .gz path writes compact gzip JSON, an empty path skips it
 
 EXIT CODES:
   0 = Success (temporary or final)
@@ -107,7 +137,10 @@ EXAMPLES:
         "--raw-out",
         type=str,
         default="./klines_raw.json",
-        help="Path for raw klines output (default: ./klines_raw.json)",
+        help=(
+            "Path for raw klines output (default: ./klines_raw.json); "
+            "a .gz suffix writes compact gzip-compressed JSON, an empty value skips the file"
+        ),
     )
 
     parser.add_argument(
@@ -124,6 +157,11 @@ def get_now_utc_ms() -> int:
     return int(time.time() * 1000)
 
 
+def ms_to_iso(timestamp_ms: int) -> str:
+    """ISO 8601 UTC timestamp for epoch milliseconds, by exact offset from the epoch."""
+    return (UTC_EPOCH + timedelta(milliseconds=timestamp_ms)).isoformat()
+
+
 def floor_to_minute_ms(timestamp_ms: int) -> int:
     """Floor timestamp to the start of its minute."""
     return (timestamp_ms // INTERVAL_MS) * INTERVAL_MS
@@ -160,142 +198,140 @@ def fetch_klines(
 
     for exchange in exchanges:
         url = f"{exchange}/api/v3/klines"
-
-        for attempt in range(3):
-            try:
-                response = requests.get(url, params=params, timeout=10)
-
-                if response.status_code == 200:
-                    return response.json()  # type: ignore[no-any-return]
-
-                if response.status_code == 429:
-                    # Rate limited, try next exchange
-                    print(
-                        f"Rate limited on {exchange}, attempt {attempt + 1}/3",
-                        file=sys.stderr,
-                    )
-                    time.sleep(1 * (attempt + 1))
-                    continue
-
-                if response.status_code >= 500:
-                    print(
-                        f"Server error {response.status_code} on {exchange}, "
-                        f"attempt {attempt + 1}/3",
-                        file=sys.stderr,
-                    )
-                    time.sleep(1 * (attempt + 1))
-                    continue
-
-                # Other error, try next exchange
-                print(
-                    f"HTTP {response.status_code} on {exchange}: {response.text[:100]}",
-                    file=sys.stderr,
-                )
-                break
-
-            except (requests.RequestException, requests.Timeout) as e:
-                print(
-                    f"Network error on {exchange}, attempt {attempt + 1}/3: {e}",
-                    file=sys.stderr,
-                )
-                time.sleep(1 * (attempt + 1))
+        try:
+            # 429/5xx and connection errors are retried with backoff by the session adapter
+            response = _SESSION.get(url, params=params, timeout=10)
+            if response.status_code == 200:
+                return decode_json(response.content)  # type: ignore[no-any-return]
+            # Retries exhausted or a non-retryable status: try the next exchange
+            print(
+                f"HTTP {response.status_code} on {exchange}: {response.text[:100]}",
+                file=sys.stderr,
+            )
+        except (requests.RequestException, ValueError) as e:
+            # ValueError: malformed JSON body
+            print(f"Network error on {exchange}: {e}", file=sys.stderr)
 
     raise RuntimeError("Failed to fetch klines after all retries and fallback exchanges")
 
 
-def validate_and_filter_klines(
+def decode_json(body: bytes) -> Any:
+    """Parse a JSON response body, via orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # e.g. NaN/Infinity literals or a UTF-8 BOM; let the stdlib parser decide
+            pass
+    return json.loads(body)
+
+
+def write_json(path: str, obj: Any) -> None:
+    """Write a bulk raw artifact as 2-space indented JSON, via orjson when it is installed."""
+    if orjson is not None:
+        try:
+            Path(path).write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+            return
+        except TypeError:
+            # e.g. integers beyond 64 bits; let the stdlib encoder decide
+            pass
+    Path(path).write_text(json.dumps(obj, indent=2))
+
+
+def write_raw_klines(path: str, raw_klines: list[list[Any]]) -> None:
+    """Write the raw klines artifact; skipped for an empty path, gzip-compressed for .gz."""
+    if not path:
+        return
+    if not path.endswith(".gz"):
+        write_json(path, raw_klines)
+        return
+    data: bytes | None = None
+    if orjson is not None:
+        try:
+            data = orjson.dumps(raw_klines)
+        except TypeError:
+            # e.g. integers beyond 64 bits; let the stdlib encoder decide
+            pass
+    if data is None:
+        data = json.dumps(raw_klines, separators=(",", ":")).encode("utf-8")
+    # Level 1: most of the size win on repetitive numeric JSON for little CPU
+    with gzip.open(path, "wb", compresslevel=1) as f:
+        f.write(data)
+
+
+def filter_and_check(
     klines: list[list[Any]],
-    symbol: str,
+    start_ms: int,
     effective_end_open_ms: int,
-) -> list[dict[str, Any]]:
+) -> tuple[list[int], list[str], bool, list[int]]:
     """
-    Validate and filter klines to the effective window.
+    Filter klines to the effective window in open-time order and check contiguity
+    from start_ms in the same pass. Only the open times and closes are extracted;
+    the raw klines are kept untouched for the raw artifact.
 
     Args:
         klines: Raw kline data from Binance
-        symbol: Expected symbol
+        start_ms: Expected open time of the first kline
         effective_end_open_ms: Maximum open time to include
 
     Returns:
-        List of validated and filtered klines as dictionaries
+        Tuple of (open_times, closes, is_contiguous, missing_open_times), where
+        missing times are taken from the first len(open_times) grid minutes
     """
-    filtered = []
-
-    for k in klines:
-        open_time = int(k[0])
-
+    open_times: list[int] = []
+    closes: list[str] = []
+    missing: list[int] = []
+    contiguous = True
+    step = INTERVAL_MS  # local: read on every kline
+    expected_open = start_ms  # grid minute the next kline must open at to stay contiguous
+    next_expected = start_ms  # earliest grid minute not yet matched or reported missing
+
+    # (open time, close) per kline, index 4 being the close price; sorted on the open
+    # time only, so klines sharing an open time keep their API order
+    rows = sorted([(int(k[0]), str(k[4])) for k in klines], key=itemgetter(0))
+    for open_time, close in rows:
         if open_time > effective_end_open_ms:
-            continue
-
-        # Parse kline data
-        kline_dict = {
-            "openTime": open_time,
-            "open": str(k[1]),
-            "high": str(k[2]),
-            "low": str(k[3]),
-            "close": str(k[4]),  # Index 4 is close price
-            "volume": str(k[5]),
-            "closeTime": int(k[6]),
-            "quoteVolume": str(k[7]),
-            "trades": int(k[8]),
-            "takerBuyBaseVolume": str(k[9]),
-            "takerBuyQuoteVolume": str(k[10]),
-            "ignore": str(k[11]),
-        }
-
-        filtered.append(kline_dict)
-
-    return filtered
-
-
-def check_contiguity(
-    klines: list[dict[str, Any]],
-    start_ms: int,
-) -> tuple[bool, list[int]]:
-    """
-    Check if klines are contiguous starting from start_ms.
+            break
+        if open_time != expected_open:
+            contiguous = False
+        expected_open += step
+        open_times.append(open_time)
+        closes.append(close)
 
-    Args:
-        klines: List of kline dictionaries
-        start_ms: Expected start time
+        # Grid minutes passed over before this open time are missing
+        while next_expected < open_time:
+            missing.append(next_expected)
+            next_expected += step
+        if next_expected == open_time:
+            next_expected += step
 
-    Returns:
-        Tuple of (is_contiguous, list_of_missing_open_times)
-    """
-    if not klines:
-        return True, []
+    # Exactly the first len(open_times) grid minutes, [start_ms, expected_open), are expected
+    while missing and missing[-1] >= expected_open:
+        missing.pop()
+    missing.extend(range(next_expected, expected_open, step))
 
-    expected_times = {start_ms + i * INTERVAL_MS for i in range(len(klines))}
-    actual_times = {k["openTime"] for k in klines}
-    missing = sorted(expected_times - actual_times)
+    return open_times, closes, contiguous, missing
 
-    # Also check ordering
-    for i, k in enumerate(klines):
-        expected = start_ms + i * INTERVAL_MS
-        if k["openTime"] != expected:
-            return False, missing
 
-    return len(missing) == 0, missing
-
-
-def calculate_twap(klines: list[dict[str, Any]]) -> tuple[Decimal | None, int | None]:
+def calculate_twap(closes: list[str]) -> tuple[Decimal | None, int | None]:
     """
-    Calculate TWAP from klines using decimal arithmetic.
+    Calculate TWAP from close prices using decimal arithmetic.
 
     Args:
-        klines: List of kline dictionaries
+        closes: Close prices as decimal strings
 
     Returns:
         Tuple of (mean_decimal, result_integer_times_100)
     """
-    if not klines:
+    if not closes:
         return None, None
 
-    closes = [Decimal(k["close"]) for k in klines]
-    mean = sum(closes) / Decimal(len(closes))
+    # Closes are kept as the API's decimal strings; parse each exactly once while summing
+    total = sum(map(Decimal, closes), Decimal(0))
+    mean = total / len(closes)
 
     # Multiply by 100 and round half-up
-    result_times_100 = (mean * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+    result_times_100 = (mean * 100).quantize(RESULT_QUANTUM, rounding=ROUND_HALF_UP)
 
     return mean, int(result_times_100)
 
@@ -328,26 +364,20 @@ def main() -> None:
         sys.exit(3)
 
     # Save raw klines
-    Path(args.raw_out).write_text(json.dumps(raw_klines, indent=2))
+    write_raw_klines(args.raw_out, raw_klines)
 
-    # Validate and filter
-    filtered_klines = validate_and_filter_klines(
+    # Filter to the effective window, sort by open time and check contiguity
+    open_times, closes, contiguous, missing_times = filter_and_check(
         raw_klines,
-        args.symbol,
+        WINDOW_START_MS,
         effective_end_open_ms,
     )
 
-    # Sort by open time
-    filtered_klines.sort(key=lambda k: k["openTime"])
-
-    # Check contiguity
-    contiguous, missing_times = check_contiguity(filtered_klines, WINDOW_START_MS)
-
     # Calculate TWAP
-    mean, result = calculate_twap(filtered_klines)
+    mean, result = calculate_twap(closes)
 
     # Determine completeness
-    observed_count = len(filtered_klines)
+    observed_count = len(open_times)
     complete = (
         observed_count == EXPECTED_FINAL_COUNT and effective_end_open_ms == WINDOW_END_OPEN_MS
     )
@@ -358,11 +388,8 @@ def main() -> None:
         "interval": "1m",
         "window_start_iso": WINDOW_START_ISO,
         "window_end_open_iso": WINDOW_END_OPEN_ISO,
-        "now_iso": datetime.fromtimestamp(now_ms / 1000, tz=timezone.utc).isoformat(),
-        "effective_end_open_iso": datetime.fromtimestamp(
-            effective_end_open_ms / 1000,
-            tz=timezone.utc,
-        ).isoformat(),
+        "now_iso": ms_to_iso(now_ms),
+        "effective_end_open_iso": ms_to_iso(effective_end_open_ms),
         "observed_count": observed_count,
         "expected_count_for_now": int(expected_partial_count),
         "complete": complete,
@@ -383,6 +410,8 @@ def main() -> None:
     }
 
     # Write diagnostics JSON
+    # Human-facing: stdlib json keeps the previous bytes (orjson output is equivalent
+    # JSON but leaves non-ASCII text unescaped and formats floats differently)
     Path(args.out_json).write_text(json.dumps(diagnostics, indent=2))
 
     # Output to stdout
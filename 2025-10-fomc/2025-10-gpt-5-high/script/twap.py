@@ -16,24 +16,30 @@ named "<ISO8601-UTC-timestamp>-<model_name>" by default.
 from __future__ import annotations
 
 import argparse
+import base64
+import gzip
+import http.client
 import json
+import random
+import queue
+import re
 import sys
+import threading
 import time
 from dataclasses import dataclass
-from datetime import datetime, timezone
-from decimal import Decimal, ROUND_HALF_UP, getcontext
+from datetime import datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP, localcontext
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from urllib.parse import unquote, urlencode, urlsplit
+from urllib.request import getproxies, proxy_bypass
 
 try:
-    # stdlib in 3.11+
-    from urllib.request import Request, urlopen
-    from urllib.error import HTTPError, URLError
-except Exception:  # pragma: no cover
-    Request = None  # type: ignore
-    urlopen = None  # type: ignore
-    HTTPError = Exception  # type: ignore
-    URLError = Exception  # type: ignore
+    import orjson
+except ImportError:  # optional speedup; the stdlib json module is the fallback
+    orjson = None  # type: ignore[assignment]
 
 
 # ---- Constants (from spec) ----
@@ -45,6 +51,11 @@ WINDOW_START_MS = 1761760800000
 WINDOW_END_OPEN_MS = 1761803940000
 INTERVAL_MS = 60_000
 EXPECTED_FINAL_COUNT = 720
+# Naive on purpose: isoformat() then carries no offset and a "Z" is appended
+UTC_EPOCH = datetime(1970, 1, 1)
+
+# Every open time in the fixed window; partial windows slice a prefix
+_WINDOW_OPENS_MS = tuple(range(WINDOW_START_MS, WINDOW_END_OPEN_MS + 1, INTERVAL_MS))
 
 DEFAULT_BASE = "https://api.binance.com"
 ALT_BASES = [
@@ -54,17 +65,46 @@ ALT_BASES = [
     "https://api3.binance.com",
 ]
 
+USER_AGENT = "metric-report-twap/1.0 (+https://binance.com)"
+
+# Characters stripped from --model-name when naming the run directory
+_MODEL_NAME_DISALLOWED = re.compile(r"[^A-Za-z0-9._-]")
+
+# A mirror that has not answered within this many seconds is hedged by
+# starting the next base in parallel; the first valid response wins
+HEDGE_DELAY_S = 1.5
+
+# Pause between failed sweeps: exponential from BACKOFF_BASE_S, capped at
+# BACKOFF_MAX_S, plus up to BACKOFF_JITTER_S so concurrent runs do not retry
+# in lockstep
+BACKOFF_BASE_S = 0.05
+BACKOFF_MAX_S = 1.0
+BACKOFF_JITTER_S = 0.05
+
+# Idle keep-alive connections keyed by base URL: retries and the re-fetch for
+# a short window reuse one TCP+TLS session per host instead of reconnecting.
+# A connection is checked out while a request is in flight, so concurrent
+# requests never share one.
+_CONNECTIONS: Dict[str, http.client.HTTPConnection] = {}
+
+_PARSER: Optional[argparse.ArgumentParser] = None
+
 
 def utc_now_ms() -> int:
     return int(time.time() * 1000)
 
 
 def floor_to_minute_open_ms(ms: int) -> int:
-    return ms - (ms % INTERVAL_MS)
+    return (ms // INTERVAL_MS) * INTERVAL_MS
+
+
+def ms_to_iso(ms: int) -> str:
+    """YYYY-MM-DDTHH:MM:SSZ for epoch milliseconds, by exact offset from the epoch."""
+    return (UTC_EPOCH + timedelta(milliseconds=ms)).isoformat(timespec="seconds") + "Z"
 
 
 def iso_now_utc() -> str:
-    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return ms_to_iso(utc_now_ms())
 
 
 def iso_timestamp_for_dir() -> str:
@@ -74,10 +114,8 @@ def iso_timestamp_for_dir() -> str:
 
 
 def sanitize_model_name(name: str) -> str:
-    # keep alnum, dash, dot, underscore; replace spaces with dashes
-    allowed = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-._")
-    name = name.replace(" ", "-")
-    return "".join(ch for ch in name if ch in allowed) or "model"
+    # keep ASCII alnum, dash, dot, underscore; replace spaces with dashes
+    return _MODEL_NAME_DISALLOWED.sub("", name.replace(" ", "-")) or "model"
 
 
 @dataclass
@@ -87,27 +125,109 @@ class FetchResult:
     body: bytes
 
 
-def http_get(url: str, timeout_s: float = 15.0, headers: Optional[Dict[str, str]] = None) -> FetchResult:
-    req = Request(url, headers={
-        "User-Agent": "metric-report-twap/1.0 (+https://binance.com)",
-        **(headers or {}),
-    })
-    try:
-        with urlopen(req, timeout=timeout_s) as resp:  # type: ignore[arg-type]
+def _checkout_connection(base: str, timeout_s: float) -> http.client.HTTPConnection:
+    conn = _CONNECTIONS.pop(base, None)
+    if conn is None:
+        conn = _new_connection(base, timeout_s)
+    return conn
+
+
+def _new_connection(base: str, timeout_s: float) -> http.client.HTTPConnection:
+    # Honour HTTP(S)_PROXY / NO_PROXY like urlopen does, tunnelling through the proxy with
+    # CONNECT so the keep-alive connection is reused either way
+    parts = urlsplit(base)
+    proxy = None if proxy_bypass(parts.hostname or "") else getproxies().get(parts.scheme)
+    host = parts.netloc
+    tunnel_headers: Dict[str, str] = {}
+    if proxy is not None:
+        proxy_url = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+        host = proxy_url.hostname or ""
+        if proxy_url.port is not None:
+            host = f"{host}:{proxy_url.port}"
+        if proxy_url.username is not None:
+            creds = f"{unquote(proxy_url.username)}:{unquote(proxy_url.password or '')}"
+            token = base64.b64encode(creds.encode("utf-8")).decode("ascii")
+            tunnel_headers["Proxy-Authorization"] = f"Basic {token}"
+    cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    conn = cls(host, timeout=timeout_s)
+    if proxy is not None:
+        conn.set_tunnel(parts.hostname or "", parts.port, headers=tunnel_headers)
+    return conn
+
+
+def _checkin_connection(base: str, conn: http.client.HTTPConnection) -> None:
+    if _CONNECTIONS.setdefault(base, conn) is not conn:
+        conn.close()
+
+
+def http_get(
+    base: str, path: str, timeout_s: float = 15.0, headers: Optional[Dict[str, str]] = None
+) -> FetchResult:
+    """GET `path` on `base` (no trailing slash) over its pooled keep-alive connection.
+
+    The body is requested gzip-compressed and returned decompressed.
+    Network errors map to status 598 (after one retry on a fresh connection,
+    in case the server closed an idle one); the connection is dropped on
+    any failure or non-200 response.
+    """
+    endpoint = base + path
+    req_headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip", **(headers or {})}
+    for attempt in range(2):
+        conn = _checkout_connection(base, timeout_s)
+        try:
+            conn.request("GET", path, headers=req_headers)
+            resp = conn.getresponse()
             body = resp.read()
-            status = getattr(resp, "status", 200)
-            endpoint = f"{resp.url}"  # type: ignore[attr-defined]
-            return FetchResult(endpoint=endpoint, status=status, body=body)
-    except HTTPError as e:  # type: ignore[misc]
-        return FetchResult(endpoint=url, status=getattr(e, "code", 599), body=b"")
-    except URLError:  # type: ignore[misc]
-        return FetchResult(endpoint=url, status=598, body=b"")
-
-
-def build_klines_url(base: str, symbol: str, start_ms: int, limit: int) -> str:
-    return (
-        f"{base.rstrip('/')}/api/v3/klines?symbol={symbol}&interval=1m&startTime={start_ms}&limit={limit}"
-    )
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            if attempt:
+                return FetchResult(endpoint=endpoint, status=598, body=b"")
+            continue
+        break
+    if resp.status != 200:
+        conn.close()
+        return FetchResult(endpoint=endpoint, status=resp.status, body=b"")
+    if resp.will_close:
+        conn.close()
+    else:
+        _checkin_connection(base, conn)
+    if (resp.getheader("Content-Encoding") or "").lower() == "gzip":
+        # ~720 klines of repetitive numeric text compress several-fold on the wire
+        body = gzip.decompress(body)
+    return FetchResult(endpoint=endpoint, status=resp.status, body=body)
+
+
+def decode_json(body: bytes) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # e.g. NaN/Infinity literals or a UTF-8 BOM; let the stdlib parser decide
+            pass
+    return json.loads(body.decode("utf-8"))
+
+
+def dump_json(obj: Any, indent: bool = True) -> bytes:
+    """UTF-8 JSON for `obj` with a trailing newline, two-space indented or compact."""
+    if orjson is not None:
+        option = orjson.OPT_APPEND_NEWLINE | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            # e.g. integers beyond 64 bits; let the stdlib encoder decide
+            pass
+    if indent:
+        return (json.dumps(obj, indent=2) + "\n").encode("utf-8")
+    return (json.dumps(obj, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def build_klines_path(symbol: str, start_ms: int, limit: int) -> str:
+    query = urlencode({"symbol": symbol, "interval": "1m", "startTime": start_ms, "limit": limit})
+    return f"/api/v3/klines?{query}"
+
+
+# (status, klines or None, endpoint) from one GET against one base
+KlinesResult = Tuple[int, Optional[List[Any]], str]
 
 
 def fetch_klines_with_retries(
@@ -123,37 +243,87 @@ def fetch_klines_with_retries(
     Returns (klines_json, endpoint_used, request_params)
     On failure after retries, raises RuntimeError.
     """
-    # rotation order per attempt
-    bases = [base] + [b for b in alt_bases if b != base]
+    # rotation order per attempt; trailing slashes stripped once, up front
+    base = base.rstrip("/")
+    bases = [base] + [b for b in (a.rstrip("/") for a in alt_bases) if b != base]
     last_err_status: Optional[int] = None
     last_endpoint = ""
+    path = build_klines_path(symbol, start_ms, limit)
+    request_params = {"symbol": symbol, "interval": "1m", "startTime": start_ms, "limit": limit}
 
     for attempt in range(retries):
-        for b in bases:
-            url = build_klines_url(b, symbol, start_ms, limit)
-            res = http_get(url, timeout_s=timeout_s)
-            last_endpoint = url
-            if res.status == 200 and res.body:
-                try:
-                    data = json.loads(res.body.decode("utf-8"))
-                    if isinstance(data, list):
-                        return data, b, {
-                            "symbol": symbol,
-                            "interval": "1m",
-                            "startTime": start_ms,
-                            "limit": limit,
-                        }
-                except Exception:
-                    # treat as parse failure; continue
-                    last_err_status = 597
-                    continue
-            # 429/5xx/timeouts: backoff, try next base
-            last_err_status = res.status
-        time.sleep(0.4 * (attempt + 1))
+        # Hedged sweep: bases start in rotation order, the next one as soon as
+        # the previous fails or after HEDGE_DELAY_S, so a slow primary costs
+        # at most the hedge delay rather than a full timeout. Requests run on
+        # daemon threads: a loser still stalled when we return neither blocks
+        # the caller nor keeps the interpreter alive at exit. Each sweep gets
+        # its own queue, so late results from an earlier sweep are ignored.
+        results: queue.Queue[Tuple[str, KlinesResult]] = queue.Queue()
+        queued = iter(bases)
+        next_base = next(queued, None)
+        in_flight = 0
+        while next_base is not None or in_flight:
+            if next_base is not None:
+                threading.Thread(
+                    target=_fetch_klines_into,
+                    args=(results, next_base, path, timeout_s),
+                    daemon=True,
+                ).start()
+                in_flight += 1
+                next_base = next(queued, None)
+            try:
+                b, (status, data, endpoint) = results.get(
+                    timeout=HEDGE_DELAY_S if next_base is not None else None
+                )
+            except queue.Empty:
+                continue
+            in_flight -= 1
+            if data is not None:
+                return data, b, request_params
+            # 429/5xx/timeouts/parse failures: try the remaining bases
+            last_err_status = status
+            last_endpoint = endpoint
+        if attempt + 1 < retries:
+            time.sleep(backoff_delay(attempt))
 
     raise RuntimeError(f"Network failure after retries; last_status={last_err_status} endpoint={last_endpoint}")
 
 
+def backoff_delay(attempt: int) -> float:
+    return min(BACKOFF_MAX_S, BACKOFF_BASE_S * (2 ** attempt)) + random.uniform(0, BACKOFF_JITTER_S)
+
+
+def _fetch_klines_into(
+    results: queue.Queue[Tuple[str, KlinesResult]],
+    base: str,
+    path: str,
+    timeout_s: float,
+) -> None:
+    """Thread target: run _fetch_klines_once and report (base, result) on `results`."""
+    try:
+        result = _fetch_klines_once(base, path, timeout_s)
+    except Exception:
+        # Always report back, or the sweep would wait on this base forever
+        result = (598, None, base + path)
+    results.put((base, result))
+
+
+def _fetch_klines_once(base: str, path: str, timeout_s: float) -> KlinesResult:
+    """One klines GET against `base`: (status, klines or None, endpoint).
+
+    Status 597 marks a 200 response whose body is not valid JSON.
+    """
+    res = http_get(base, path, timeout_s=timeout_s)
+    if res.status == 200 and res.body:
+        try:
+            data = decode_json(res.body)
+        except Exception:
+            return 597, None, res.endpoint
+        if isinstance(data, list):
+            return res.status, data, res.endpoint
+    return res.status, None, res.endpoint
+
+
 def compute_effective_end_open_ms(now_ms: int) -> int:
     last_closed_open_ms = floor_to_minute_open_ms(now_ms) - INTERVAL_MS
     return min(WINDOW_END_OPEN_MS, last_closed_open_ms)
@@ -162,7 +332,35 @@ def compute_effective_end_open_ms(now_ms: int) -> int:
 def post_filter_and_sort(
     klines: Sequence[Sequence[Any]], start_ms: int, effective_end_open_ms: int
 ) -> List[Sequence[Any]]:
-    out = [
+    if _well_formed_klines(klines):
+        out = [k for k in klines if start_ms <= k[0] <= effective_end_open_ms]
+    else:
+        out = _filter_klines_guarded(klines, start_ms, effective_end_open_ms)
+    # Binance returns klines ascending by open time; only sort if they are not
+    opens = [int(k[0]) for k in out]
+    if opens != sorted(opens):
+        out.sort(key=lambda k: int(k[0]))
+    return out
+
+
+def _well_formed_klines(klines: Sequence[Sequence[Any]]) -> bool:
+    """True if every kline is a list/tuple of at least 5 fields with an int open
+    time, as a parsed Binance payload always is. Checked with C-level map()
+    passes over the whole payload rather than per-element guards."""
+    try:
+        return (
+            set(map(type, klines)) <= {list, tuple}
+            and min(map(len, klines), default=5) >= 5
+            and set(map(type, map(itemgetter(0), klines))) <= {int}
+        )
+    except (TypeError, IndexError):
+        return False
+
+
+def _filter_klines_guarded(
+    klines: Sequence[Sequence[Any]], start_ms: int, effective_end_open_ms: int
+) -> List[Sequence[Any]]:
+    return [
         k for k in klines
         if isinstance(k, (list, tuple))
         and len(k) >= 5
@@ -170,8 +368,6 @@ def post_filter_and_sort(
         and int(k[0]) >= start_ms
         and int(k[0]) <= effective_end_open_ms
     ]
-    out.sort(key=lambda k: int(k[0]))
-    return out
 
 
 def expected_count_for_now(effective_end_open_ms: int) -> int:
@@ -185,23 +381,45 @@ def check_contiguity(
 ) -> Tuple[bool, List[int]]:
     if not observed_opens_ms:
         return True, []
-    expected_last = effective_end_open_ms
-    expected_opens = list(range(WINDOW_START_MS, expected_last + 1, INTERVAL_MS))
-    obs_set = set(int(x) for x in observed_opens_ms)
+    expected_opens: Sequence[int]
+    if effective_end_open_ms <= WINDOW_END_OPEN_MS:
+        expected_opens = _WINDOW_OPENS_MS[: expected_count_for_now(effective_end_open_ms)]
+    else:
+        expected_opens = range(WINDOW_START_MS, effective_end_open_ms + 1, INTERVAL_MS)
+    obs_set = set(observed_opens_ms)
+    # Common case: every expected minute is present, checked in one C-level pass
+    if obs_set.issuperset(expected_opens):
+        return True, []
     missing = [t for t in expected_opens if t not in obs_set]
-    contiguous = len(missing) == 0
-    return contiguous, missing
+    return False, missing
 
 
-def decimal_mean(values: Iterable[Decimal]) -> Optional[Decimal]:
-    total = Decimal(0)
-    n = 0
-    for v in values:
-        total += v
-        n += 1
-    if n == 0:
+def parse_closes(observed: Sequence[Sequence[Any]]) -> List[Decimal]:
+    """Close prices (field 4) as Decimals; malformed closes are skipped."""
+    raw = [k[4] for k in observed]
+    if all(type(v) is str for v in raw):
+        # Binance serves closes as decimal strings: convert them all in one
+        # pass, with no str() round-trip or per-element exception handling
+        try:
+            return list(map(Decimal, raw))
+        except ArithmeticError:
+            pass
+    closes: List[Decimal] = []
+    for v in raw:
+        try:
+            closes.append(Decimal(str(v)))
+        except Exception:
+            # skip malformed
+            pass
+    return closes
+
+
+def decimal_mean(values: Sequence[Decimal]) -> Optional[Decimal]:
+    # Exact Decimal sum in one C-level reduction; a float mean could flip the
+    # half-up rounding of the result at a cent boundary
+    if not values:
         return None
-    return total / Decimal(n)
+    return sum(values, Decimal(0)) / Decimal(len(values))
 
 
 def round_half_up_to_int_times_100(x: Decimal) -> int:
@@ -211,10 +429,10 @@ def round_half_up_to_int_times_100(x: Decimal) -> int:
 
 
 def write_json(path: Path, obj: Dict[str, Any]) -> None:
-    path.write_text(json.dumps(obj, indent=2, sort_keys=False) + "\n", encoding="utf-8")
+    path.write_bytes(dump_json(obj))
 
 
-def main(argv: Optional[Sequence[str]] = None) -> int:
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description=(
             "Compute 12-hour TWAP (Binance spot 1m klines) for BTCUSDT or ETHUSDT.\n"
@@ -266,15 +484,25 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         help="Do not create the timestamped run directory; write outputs to CWD or given paths.",
     )
 
-    args = parser.parse_args(argv)
+    return parser
+
+
+def _get_parser() -> argparse.ArgumentParser:
+    # Built once; repeated main() calls (tests, batch runs) reuse it
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = build_parser()
+    return _PARSER
+
 
-    # Decimal precision ample for averaging 720 prices with 2 decimal rounding
-    getcontext().prec = 40
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _get_parser().parse_args(argv)
 
     # Compute effective end boundary based on current time
     now_ms = utc_now_ms()
     now_iso = iso_now_utc()
     effective_end_open = compute_effective_end_open_ms(now_ms)
+    effective_end_open_iso = ms_to_iso(effective_end_open)
     expected_count_now = expected_count_for_now(effective_end_open)
 
     # Prepare run directory
@@ -320,26 +548,34 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
             )
             endpoint_used = base_used
             request_params = reqp
-            # write raw as returned
+            # write raw as returned; compact, since it is only read by tools
             if raw_out_path:
-                Path(raw_out_path).write_text(json.dumps(klines, indent=2) + "\n", encoding="utf-8")
+                Path(raw_out_path).write_bytes(dump_json(klines, indent=False))
 
             observed = post_filter_and_sort(klines, WINDOW_START_MS, effective_end_open)
 
-            # If short vs expected for now, retry a few times quickly
+            # If short vs expected for now, retry a few times quickly. Only the
+            # delta is re-fetched: from the first missing minute to the
+            # effective end, merged into what was already observed.
             retry_budget = 2
             while len(observed) < expected_count_now and retry_budget > 0:
                 time.sleep(0.3)
-                klines, base_used, reqp = fetch_klines_with_retries(
+                have = {int(k[0]) for k in observed}
+                gap_start = next(t for t in _WINDOW_OPENS_MS if t not in have)
+                klines, base_used, _ = fetch_klines_with_retries(
                     symbol=args.symbol,
                     base=args.exchange_base,
                     alt_bases=ALT_BASES,
-                    start_ms=WINDOW_START_MS,
-                    limit=EXPECTED_FINAL_COUNT,
+                    start_ms=gap_start,
+                    limit=(effective_end_open - gap_start) // INTERVAL_MS + 1,
                 )
                 endpoint_used = base_used
-                request_params = reqp
-                observed = post_filter_and_sort(klines, WINDOW_START_MS, effective_end_open)
+                fresh = post_filter_and_sort(klines, gap_start, effective_end_open)
+                observed = post_filter_and_sort(
+                    observed + [k for k in fresh if int(k[0]) not in have],
+                    WINDOW_START_MS,
+                    effective_end_open,
+                )
                 retry_budget -= 1
         except Exception as e:
             # network failure
@@ -352,7 +588,7 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
                 "window_start_iso": WINDOW_START_ISO,
                 "window_end_open_iso": WINDOW_END_OPEN_ISO,
                 "now_iso": now_iso,
-                "effective_end_open_iso": datetime.fromtimestamp(effective_end_open/1000, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "effective_end_open_iso": effective_end_open_iso,
                 "observed_count": 0,
                 "expected_count_for_now": expected_count_now,
                 "complete": False,
@@ -373,19 +609,17 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
     observed_opens = [int(k[0]) for k in observed]
     contiguous, missing = check_contiguity(observed_opens, effective_end_open)
 
-    closes: List[Decimal] = []
-    for k in observed:
-        try:
-            closes.append(Decimal(str(k[4])))
-        except Exception:
-            # skip malformed
-            pass
+    closes = parse_closes(observed)
 
-    mean_dec = decimal_mean(closes)
-    if mean_dec is None:
-        result_int_times_100: Optional[int] = None
-    else:
-        result_int_times_100 = round_half_up_to_int_times_100(mean_dec)
+    # Decimal precision ample for averaging 720 prices with 2 decimal rounding;
+    # scoped so the process-wide decimal context is left alone
+    with localcontext() as ctx:
+        ctx.prec = 40
+        mean_dec = decimal_mean(closes)
+        if mean_dec is None:
+            result_int_times_100: Optional[int] = None
+        else:
+            result_int_times_100 = round_half_up_to_int_times_100(mean_dec)
 
     complete = (
         observed_count == EXPECTED_FINAL_COUNT and effective_end_open == WINDOW_END_OPEN_MS
@@ -414,9 +648,7 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         "window_start_iso": WINDOW_START_ISO,
         "window_end_open_iso": WINDOW_END_OPEN_ISO,
         "now_iso": now_iso,
-        "effective_end_open_iso": datetime.fromtimestamp(
-            effective_end_open / 1000, tz=timezone.utc
-        ).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "effective_end_open_iso": effective_end_open_iso,
         "observed_count": observed_count,
         "expected_count_for_now": expected_count_now,
         "complete": bool(complete),
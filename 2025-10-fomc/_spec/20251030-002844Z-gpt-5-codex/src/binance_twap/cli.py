@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import argparse
+import atexit
+import importlib.util
 import json
 import sys
 from datetime import datetime, timezone
@@ -9,6 +11,11 @@ from typing import Sequence
 
 import httpx
 
+try:
+    import orjson
+except ImportError:  # optional speedup; the stdlib json module is the fallback
+    orjson = None  # type: ignore[assignment]
+
 from .core import (
     ALLOWED_SYMBOLS,
     EXPECTED_FINAL_COUNT,
@@ -21,6 +28,12 @@ from .core import (
 )
 from .fetch import DEFAULT_BASE_URLS, FetchError, fetch_klines
 
+# HTTP/2 needs the optional `h2` package (httpx[http2]); without it the client
+# still pools keep-alive HTTP/1.1 connections per mirror host.
+_HTTP2 = importlib.util.find_spec("h2") is not None
+_CLIENT: httpx.Client | None = None
+_PARSER: argparse.ArgumentParser | None = None
+
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
@@ -72,6 +85,28 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def _get_client() -> httpx.Client:
+    """Process-wide client, so repeat fetches and mirror fallbacks reuse connections."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = httpx.Client(
+            http2=_HTTP2,
+            limits=httpx.Limits(max_keepalive_connections=8, max_connections=8),
+            timeout=httpx.Timeout(15.0, connect=3.0),
+            headers={"User-Agent": "binance-twap/1.0"},
+        )
+        atexit.register(_CLIENT.close)
+    return _CLIENT
+
+
+def _get_parser() -> argparse.ArgumentParser:
+    """Parser built on first use and reused by later main() calls."""
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = build_parser()
+    return _PARSER
+
+
 def _validate_fixed_window(start: str, end_open: str) -> None:
     if start != WINDOW_START_ISO or end_open != WINDOW_END_OPEN_ISO:
         raise SystemExit(
@@ -96,9 +131,17 @@ def _write_json(path: Path, payload: object) -> None:
 
 def _write_raw(path: Path, payload: object) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as handle:
-        json.dump(payload, handle)
-        handle.write("\n")
+    path.write_bytes(_dumps_compact(payload) + b"\n")
+
+
+def _dumps_compact(payload: object) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload)
+        except TypeError:
+            # e.g. integers beyond 64 bits; let the stdlib encoder decide
+            pass
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
 
 
 def _emit_stdout(result: ProcessedData) -> None:
@@ -117,8 +160,7 @@ def _emit_stdout(result: ProcessedData) -> None:
 
 
 def main(argv: Sequence[str] | None = None) -> int:
-    parser = build_parser()
-    args = parser.parse_args(argv)
+    args = _get_parser().parse_args(argv)
 
     _validate_fixed_window(args.start, args.end_open)
 
@@ -134,14 +176,13 @@ def main(argv: Sequence[str] | None = None) -> int:
 
     if now_ms >= WINDOW_START_MS:
         try:
-            with httpx.Client() as client:
-                outcome = fetch_klines(
-                    symbol,
-                    client=client,
-                    base_urls=base_urls,
-                    start_time_ms=WINDOW_START_MS,
-                    limit=EXPECTED_FINAL_COUNT,
-                )
+            outcome = fetch_klines(
+                symbol,
+                client=_get_client(),
+                base_urls=base_urls,
+                start_time_ms=WINDOW_START_MS,
+                limit=EXPECTED_FINAL_COUNT,
+            )
             endpoint = outcome.endpoint
             raw_klines = outcome.klines
         except FetchError as exc:
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime, timezone
-from decimal import Decimal, ROUND_HALF_UP, getcontext
+from datetime import datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP, localcontext
+from operator import itemgetter
 from typing import Any, Iterable, Sequence
 
 INTERVAL_MS = 60_000
@@ -12,8 +13,15 @@ WINDOW_END_OPEN_MS = 1_761_803_940_000
 WINDOW_START_ISO = "2025-10-29T18:00:00Z"
 WINDOW_END_OPEN_ISO = "2025-10-30T05:59:00Z"
 ALLOWED_SYMBOLS = frozenset({"BTCUSDT", "ETHUSDT"})
+# Naive on purpose: isoformat() then carries no offset and a "Z" is appended
+UTC_EPOCH = datetime(1970, 1, 1)
 
-getcontext().prec = 34
+# Every open time in the canonical window; partial windows slice a prefix
+_WINDOW_OPEN_TIMES = tuple(range(WINDOW_START_MS, WINDOW_END_OPEN_MS + 1, INTERVAL_MS))
+
+# Decimal precision for the TWAP arithmetic, applied through a local context
+# so importing this module leaves the caller's decimal context untouched
+DECIMAL_PRECISION = 34
 
 
 @dataclass(frozen=True)
@@ -38,7 +46,7 @@ class ProcessedData:
 
 
 def floor_to_minute(open_ms: int) -> int:
-    return open_ms - (open_ms % INTERVAL_MS)
+    return (open_ms // INTERVAL_MS) * INTERVAL_MS
 
 
 def compute_effective_end_open_ms(now_ms: int) -> int:
@@ -47,23 +55,23 @@ def compute_effective_end_open_ms(now_ms: int) -> int:
 
 
 def isoformat_from_ms(epoch_ms: int) -> str:
-    return datetime.fromtimestamp(epoch_ms / 1000, tz=timezone.utc).isoformat().replace(
-        "+00:00", "Z"
-    )
+    # Exact offset from the epoch: no float seconds or tz-aware conversion
+    return (UTC_EPOCH + timedelta(milliseconds=epoch_ms)).isoformat() + "Z"
 
 
 def expected_count_for_effective_end(effective_end_open_ms: int) -> int:
     if effective_end_open_ms < WINDOW_START_MS:
         return 0
     delta = effective_end_open_ms - WINDOW_START_MS
-    return int(delta / INTERVAL_MS) + 1
+    return delta // INTERVAL_MS + 1
 
 
 def parse_close(value: Any) -> Decimal:
-    if isinstance(value, (float, int)):
-        return Decimal(str(value))
+    # Binance serves closes as decimal strings, so test for that first
     if isinstance(value, str):
         return Decimal(value)
+    if isinstance(value, (float, int)):
+        return Decimal(str(value))
     raise TypeError(f"Unsupported close value type: {type(value)}")
 
 
@@ -85,29 +93,35 @@ def collect_observed_klines(
         if open_time > effective_end_open_ms:
             continue
         observed.append((open_time, close_price))
-    observed.sort(key=lambda item: item[0])
+    # Binance returns klines ascending by open time; only sort if they are not
+    open_times = [open_time for open_time, _ in observed]
+    if open_times != sorted(open_times):
+        observed.sort(key=itemgetter(0))
     return observed
 
 
+def _expected_open_times(effective_end_open_ms: int) -> Sequence[int]:
+    if effective_end_open_ms > WINDOW_END_OPEN_MS:
+        return range(WINDOW_START_MS, effective_end_open_ms + 1, INTERVAL_MS)
+    return _WINDOW_OPEN_TIMES[: expected_count_for_effective_end(effective_end_open_ms)]
+
+
 def compute_missing_open_times(
     observed_open_times: list[int],
     effective_end_open_ms: int,
 ) -> list[int]:
-    if not observed_open_times:
-        return [
-            ts
-            for ts in range(WINDOW_START_MS, effective_end_open_ms + 1, INTERVAL_MS)
-        ]
+    expected = _expected_open_times(effective_end_open_ms)
     observed_set = set(observed_open_times)
-    return [
-        ts
-        for ts in range(WINDOW_START_MS, effective_end_open_ms + 1, INTERVAL_MS)
-        if ts not in observed_set
-    ]
+    # Common case: no gaps, confirmed without a per-minute Python loop
+    if observed_set.issuperset(expected):
+        return []
+    return [ts for ts in expected if ts not in observed_set]
 
 
 def round_half_up_to_int(value: Decimal) -> int:
-    scaled = (value * Decimal("100")).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+    with localcontext() as ctx:
+        ctx.prec = DECIMAL_PRECISION
+        scaled = (value * Decimal("100")).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
     result = int(scaled)
     if result < 0:
         raise ValueError("TWAP result must be unsigned.")
@@ -213,7 +227,9 @@ def process(
         )
 
     closes = [close for _, close in observed]
-    twap_mean = sum(closes, start=Decimal()) / Decimal(len(closes))
+    with localcontext() as ctx:
+        ctx.prec = DECIMAL_PRECISION
+        twap_mean = sum(closes, start=Decimal()) / Decimal(len(closes))
     result_value = round_half_up_to_int(twap_mean)
 
     notes = "final" if complete and contiguous else "temporary"
@@ -1,17 +1,34 @@
 from __future__ import annotations
 
+import json
+import queue
+import random
+import threading
 import time
 from dataclasses import dataclass
 from typing import Any, Callable, Protocol, Sequence
 
 import httpx
 
+try:
+    import orjson
+except ImportError:  # optional speedup; the stdlib json module is the fallback
+    orjson = None  # type: ignore[assignment]
+
 DEFAULT_BASE_URLS: tuple[str, ...] = (
     "https://api.binance.com",
     "https://api1.binance.com",
     "https://api-gcp.binance.com",
 )
 
+# Circuit breaker: a base URL that fails this many times in a row is skipped
+# for the cooldown, so later calls in the process go straight to a healthy host
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN_SECONDS = 60.0
+
+# base URL -> (consecutive failures, monotonic time until which it is skipped)
+_endpoint_health: dict[str, tuple[int, float]] = {}
+
 
 class SupportsGet(Protocol):
     def get(self, url: str, *, params: dict[str, Any], timeout: float) -> httpx.Response:
@@ -39,67 +56,140 @@ def fetch_klines(
     retries: int = 3,
     timeout: float = 10.0,
     backoff_seconds: float = 0.5,
+    max_backoff: float = 10.0,
+    hedge_delay: float = 1.0,
     sleeper: Callable[[float], None] = time.sleep,
 ) -> FetchOutcome:
+    """Fetch klines, rotating across `base_urls` for up to `retries` attempts.
+
+    An attempt that fails is followed by a backoff and the next base URL. An
+    attempt still in flight after `hedge_delay` seconds is hedged: the next
+    attempt starts in parallel and the first valid response wins. Base URLs
+    whose circuit breaker is open are skipped unless every one of them is.
+    """
     urls = tuple(base_urls) if base_urls else DEFAULT_BASE_URLS
     if not urls:
         raise ValueError("At least one base URL must be provided.")
-
-    errors: list[Exception] = []
-    for attempt in range(retries):
-        base_url = urls[attempt % len(urls)]
+    if retries < 1:
+        raise FetchError("Unable to fetch klines after retries.")
+
+    params: dict[str, Any] = {
+        "symbol": symbol,
+        "interval": interval,
+        "startTime": start_time_ms,
+        "limit": limit,
+    }
+    # Only the last failure is chained; earlier ones (and their responses) are not kept
+    last_error: Exception | None = None
+    # Attempts run on daemon threads and report (base URL, outcome or error)
+    # here, so a hedged request that loses the race neither blocks the caller
+    # nor keeps the process alive at exit
+    results: queue.Queue[tuple[str, FetchOutcome | Exception]] = queue.Queue()
+
+    def launch(base_url: str) -> None:
+        threading.Thread(
+            target=_fetch_into, args=(results, client, base_url, params, timeout), daemon=True
+        ).start()
+
+    attempt = 0
+    launch(_live_urls(urls)[0])
+    in_flight = 1
+    while in_flight:
+        more = attempt + 1 < retries
         try:
-            response = client.get(
-                f"{base_url}/api/v3/klines",
-                params={
-                    "symbol": symbol,
-                    "interval": interval,
-                    "startTime": start_time_ms,
-                    "limit": limit,
-                },
-                timeout=timeout,
-            )
-        except httpx.HTTPError as exc:
-            errors.append(exc)
-            _maybe_sleep(backoff_seconds, attempt, sleeper)
+            base_url, result = results.get(timeout=hedge_delay if more else None)
+        except queue.Empty:
+            # Still in flight after hedge_delay: hedge with the next attempt
+            attempt += 1
+            live = _live_urls(urls)
+            launch(live[attempt % len(live)])
+            in_flight += 1
             continue
-
-        if response.status_code in {429, 500, 502, 503, 504}:
-            errors.append(
-                FetchError(
-                    f"Transient HTTP status {response.status_code} from {base_url}",
-                )
-            )
-            _maybe_sleep(backoff_seconds, attempt, sleeper)
+        in_flight -= 1
+        if isinstance(result, FetchOutcome):
+            _endpoint_health.pop(result.endpoint, None)
+            return result
+        if not isinstance(result, (httpx.HTTPError, FetchError, ValueError)):
+            raise result
+        _record_failure(base_url)
+        last_error = result
+        if not more or in_flight:
+            # Out of attempts, or a hedged attempt is still running; let it finish
             continue
+        # Everything in flight failed: back off before the next base
+        _maybe_sleep(backoff_seconds, max_backoff, attempt, retries, sleeper)
+        attempt += 1
+        live = _live_urls(urls)
+        launch(live[attempt % len(live)])
+        in_flight += 1
 
-        try:
-            response.raise_for_status()
-        except httpx.HTTPStatusError as exc:
-            errors.append(exc)
-            _maybe_sleep(backoff_seconds, attempt, sleeper)
-            continue
+    raise FetchError("Unable to fetch klines after retries.") from last_error
 
-        try:
-            payload = response.json()
-        except ValueError as exc:
-            errors.append(exc)
-            _maybe_sleep(backoff_seconds, attempt, sleeper)
-            continue
 
-        if not isinstance(payload, list):
-            errors.append(FetchError("Unexpected response payload (expected list)."))
-            _maybe_sleep(backoff_seconds, attempt, sleeper)
-            continue
+def _live_urls(urls: tuple[str, ...]) -> tuple[str, ...]:
+    now = time.monotonic()
+    live = tuple(url for url in urls if _endpoint_health.get(url, (0, 0.0))[1] <= now)
+    # With every breaker open, trying a tripped host beats not trying at all
+    return live or urls
 
-        return FetchOutcome(endpoint=base_url, klines=payload)
 
-    if errors:
-        raise FetchError("Unable to fetch klines after retries.") from errors[-1]
-    raise FetchError("Unable to fetch klines after retries.")
+def _record_failure(base_url: str) -> None:
+    failures = _endpoint_health.get(base_url, (0, 0.0))[0] + 1
+    cooldown_until = 0.0
+    if failures >= BREAKER_THRESHOLD:
+        cooldown_until = time.monotonic() + BREAKER_COOLDOWN_SECONDS
+    _endpoint_health[base_url] = (failures, cooldown_until)
 
 
-def _maybe_sleep(backoff_seconds: float, attempt: int, sleeper: Callable[[float], None]) -> None:
-    delay = max(backoff_seconds * (attempt + 1), 0.0)
+def _fetch_into(
+    results: queue.Queue[tuple[str, FetchOutcome | Exception]],
+    client: SupportsGet,
+    base_url: str,
+    params: dict[str, Any],
+    timeout: float,
+) -> None:
+    try:
+        outcome: FetchOutcome | Exception = _fetch_once(client, base_url, params, timeout)
+    except Exception as exc:
+        # Always report back, or fetch_klines would wait on this attempt forever
+        outcome = exc
+    results.put((base_url, outcome))
+
+
+def _fetch_once(
+    client: SupportsGet, base_url: str, params: dict[str, Any], timeout: float
+) -> FetchOutcome:
+    response = client.get(f"{base_url}/api/v3/klines", params=params, timeout=timeout)
+    if response.status_code in {429, 500, 502, 503, 504}:
+        raise FetchError(f"Transient HTTP status {response.status_code} from {base_url}")
+    response.raise_for_status()
+    payload = _decode_json(response.content)
+    if not isinstance(payload, list):
+        raise FetchError("Unexpected response payload (expected list).")
+    return FetchOutcome(endpoint=base_url, klines=payload)
+
+
+def _decode_json(body: bytes) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # e.g. NaN/Infinity literals or a UTF-8 BOM; let the stdlib parser decide
+            pass
+    return json.loads(body)
+
+
+def _maybe_sleep(
+    backoff_seconds: float,
+    max_backoff: float,
+    attempt: int,
+    retries: int,
+    sleeper: Callable[[float], None],
+) -> None:
+    # No point waiting after the last attempt; the caller raises right away
+    if attempt + 1 >= retries:
+        return
+    # Capped exponential backoff, jittered so concurrent callers spread out
+    delay = min(max_backoff, backoff_seconds * (2**attempt)) * random.uniform(0.5, 1.5)
     if delay > 0:
         sleeper(delay)
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import threading
 from decimal import Decimal
 
 import httpx
 import pytest
 
+from binance_twap import fetch
 from binance_twap.core import (
     INTERVAL_MS,
     EXPECTED_FINAL_COUNT,
@@ -84,6 +86,12 @@ def test_process_strict_final_failure() -> None:
     assert processed.exit_code == 2
 
 
+@pytest.fixture(autouse=True)
+def _reset_endpoint_health() -> None:
+    # Circuit-breaker state is process-wide; keep each test independent of the others
+    fetch._endpoint_health.clear()
+
+
 class _FakeClient:
     def __init__(self, responses: list[httpx.Response]) -> None:
         self._responses = responses
@@ -143,3 +151,100 @@ def test_fetch_klines_raises_after_retries() -> None:
             sleeper=lambda _: None,
             backoff_seconds=0.0,
         )
+
+
+def test_fetch_klines_backoff_is_capped_and_skips_final_sleep() -> None:
+    base = "https://primary.example"
+    failure_response = httpx.Response(
+        503,
+        request=httpx.Request("GET", f"{base}/api/v3/klines"),
+    )
+    client = _FakeClient([failure_response] * 5)
+    delays: list[float] = []
+
+    with pytest.raises(FetchError):
+        fetch_klines(
+            "BTCUSDT",
+            client=client,
+            base_urls=[base],
+            start_time_ms=WINDOW_START_MS,
+            limit=EXPECTED_FINAL_COUNT,
+            retries=5,
+            backoff_seconds=1.0,
+            max_backoff=3.0,
+            sleeper=delays.append,
+        )
+
+    assert client.calls == 5
+    assert len(delays) == 4
+    for delay, nominal in zip(delays, [1.0, 2.0, 3.0, 3.0], strict=True):
+        assert 0.5 * nominal <= delay <= 1.5 * nominal
+
+
+class _StallingPrimaryClient:
+    """Primary host stalls until released; any other host answers at once."""
+
+    def __init__(self, payload: list[list[object]]) -> None:
+        self._payload = payload
+        self.release = threading.Event()
+
+    def get(self, url: str, *, params: dict[str, object], timeout: float) -> httpx.Response:
+        if url.startswith("https://primary.example"):
+            self.release.wait(timeout)
+        return httpx.Response(200, json=self._payload, request=httpx.Request("GET", url))
+
+
+def test_fetch_klines_hedges_stalled_primary() -> None:
+    success_payload = [_make_kline(WINDOW_START_MS, "1.0")]
+    client = _StallingPrimaryClient(success_payload)
+
+    try:
+        outcome = fetch_klines(
+            "BTCUSDT",
+            client=client,
+            base_urls=["https://primary.example", "https://secondary.example"],
+            start_time_ms=WINDOW_START_MS,
+            limit=EXPECTED_FINAL_COUNT,
+            hedge_delay=0.01,
+            sleeper=lambda _: None,
+        )
+    finally:
+        client.release.set()
+
+    assert outcome.endpoint == "https://secondary.example"
+    assert outcome.klines == success_payload
+
+
+class _DeadPrimaryClient:
+    """Primary host always refuses the connection; any other host answers at once."""
+
+    def __init__(self, payload: list[list[object]]) -> None:
+        self._payload = payload
+        self.primary_calls = 0
+
+    def get(self, url: str, *, params: dict[str, object], timeout: float) -> httpx.Response:
+        request = httpx.Request("GET", url)
+        if url.startswith("https://primary.example"):
+            self.primary_calls += 1
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json=self._payload, request=request)
+
+
+def test_fetch_klines_skips_tripped_endpoint() -> None:
+    success_payload = [_make_kline(WINDOW_START_MS, "1.0")]
+    client = _DeadPrimaryClient(success_payload)
+
+    for _ in range(fetch.BREAKER_THRESHOLD + 2):
+        outcome = fetch_klines(
+            "BTCUSDT",
+            client=client,
+            base_urls=["https://primary.example", "https://secondary.example"],
+            start_time_ms=WINDOW_START_MS,
+            limit=EXPECTED_FINAL_COUNT,
+            sleeper=lambda _: None,
+            backoff_seconds=0.0,
+        )
+        assert outcome.endpoint == "https://secondary.example"
+
+    # Once tripped, the primary is no longer tried first on every call
+    assert client.primary_calls == fetch.BREAKER_THRESHOLD
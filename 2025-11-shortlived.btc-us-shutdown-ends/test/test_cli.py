@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from types import SimpleNamespace
 from decimal import Decimal
 
@@ -8,10 +9,14 @@ import pytest
 from metric_report.cli import (
     CONFIG,
     MetricError,
+    _dumps_pretty,
+    _loads,
     ceil_cents,
     collect_window_prices,
     compute_window,
+    extract_price,
     median_price,
+    normalize_timestamp,
     resolve_decision_epoch,
 )
 
@@ -79,3 +84,80 @@ def test_resolve_decision_epoch_rejects_future_times() -> None:
     args = make_args(decision_time_epoch=CONFIG.market_end_epoch + 1)
     with pytest.raises(MetricError):
         resolve_decision_epoch(args, CONFIG)
+
+
+def test_normalize_timestamp_digit_keys_match_float_parsing() -> None:
+    assert normalize_timestamp("1762750800") == 1762750800
+    assert normalize_timestamp(" 0042 ") == 42
+    # Exactly at the threshold stays in seconds; above it is treated as milliseconds
+    assert normalize_timestamp("10000000000") == 10_000_000_000
+    assert normalize_timestamp("1762750800123") == 1762750800
+    # Non-digit keys still go through float(), as before
+    assert normalize_timestamp("1762750800.9") == 1762750800
+    assert normalize_timestamp("1.7627508e12") == 1762750800
+    assert normalize_timestamp("-5") == -5
+    assert normalize_timestamp("\u0661\u0662") == 12  # non-ASCII digits: float() accepts them
+    assert normalize_timestamp("") is None
+    assert normalize_timestamp("bad") is None
+
+
+def test_extract_price_accepts_strings_and_numbers() -> None:
+    assert extract_price({"v": ["1.50", 2]}) == Decimal("1.50")
+    assert extract_price({"v": [1.5]}) == Decimal("1.5")
+    assert extract_price({"c": "3"}) == Decimal("3")
+    assert extract_price(["2"]) == Decimal("2")
+    assert extract_price({"v": ["abc"]}) is None
+    assert extract_price({"v": [True]}) is None
+    assert extract_price({"c": "-1"}) is None
+
+
+def test_collect_window_prices_sorts_out_of_order_points() -> None:
+    payload = {
+        "data": {
+            "points": {
+                "15": {"v": ["3"]},
+                "11": {"v": ["1"]},
+                "13": {"v": ["2"]},
+                "11.0": {"v": ["5"]},  # same second as "11": the later point wins
+            }
+        }
+    }
+    prices, range_info = collect_window_prices(payload, start=10, end=20)
+    assert prices == [Decimal("5"), Decimal("2"), Decimal("3")]
+    assert range_info is not None
+    assert range_info["earliest_epoch"] == 11
+    assert range_info["latest_epoch"] == 15
+
+
+def test_collect_window_prices_keeps_latest_duplicate_in_ordered_input() -> None:
+    payload = {
+        "data": {
+            "points": {
+                "1762750800": {"v": ["1"]},
+                "1762750860": {"v": ["2"]},
+                "1762750860000": {"v": ["4"]},  # ms key for the same second
+            }
+        }
+    }
+    prices, range_info = collect_window_prices(payload, start=1762750800, end=1762750900)
+    assert prices == [Decimal("1"), Decimal("4")]
+    assert range_info is not None
+    assert range_info["latest_epoch"] == 1762750860
+
+
+def test_loads_falls_back_to_stdlib_for_bodies_orjson_rejects() -> None:
+    assert _loads(b'{"a": Infinity}') == {"a": float("inf")}
+    assert _loads(b'\xef\xbb\xbf{"a": 1}') == {"a": 1}
+
+
+def test_loads_and_dumps_without_orjson(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("metric_report.cli.orjson", None)
+    obj = {"points": {"1": {"v": ["1.5", 2]}}, "name": "caf\u00e9"}
+    assert _loads(json.dumps(obj).encode("utf-8")) == obj
+    assert _dumps_pretty(obj) == json.dumps(obj, indent=2)
+
+
+def test_dumps_pretty_falls_back_for_integers_beyond_64_bits() -> None:
+    obj = {"big": 2**70, "name": "caf\u00e9"}
+    assert _dumps_pretty(obj) == json.dumps(obj, indent=2)
+    assert json.loads(_dumps_pretty({"name": "caf\u00e9"})) == {"name": "caf\u00e9"}
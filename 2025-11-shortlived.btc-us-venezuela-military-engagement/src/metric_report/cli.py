@@ -6,18 +6,26 @@ import sys
 import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from decimal import Decimal, InvalidOperation, ROUND_CEILING, getcontext
+from decimal import Decimal, InvalidOperation, ROUND_CEILING, localcontext
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Sequence
 from urllib.error import HTTPError, URLError
 from urllib.request import Request, urlopen
 
-getcontext().prec = 50
+try:
+    import orjson
+except ImportError:  # optional speedup; the stdlib json module is the fallback
+    orjson = None  # type: ignore[assignment]
 
 CMC_ENDPOINT = "https://api.coinmarketcap.com/data-api/v3/cryptocurrency/detail/chart"
+UA_HEADERS = {"User-Agent": "cfm-metric-cli/0.1"}
 TIMESTAMP_MS_THRESHOLD = 10_000_000_000
 WINDOW_OFFSET_SECONDS = 43_200
 WINDOW_LENGTH_SECONDS = 43_200
+# Precision for the median/cents arithmetic, applied through a local context so
+# importing this module leaves the caller's decimal context untouched
+DECIMAL_PRECISION = 50
 
 
 class MetricError(Exception):
@@ -111,6 +119,7 @@ def iso_to_epoch_seconds(value: str) -> int:
     return int(dt.timestamp())
 
 
+@lru_cache(maxsize=1024)
 def epoch_to_iso(epoch: int) -> str:
     return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
@@ -157,11 +166,11 @@ def build_request_url(config: QuestionConfig, start: int, end: int) -> str:
 
 def fetch_payload(url: str, timeout: int, retries: int, backoff: float) -> Dict[str, Any]:
     last_error: Exception | None = None
+    req = Request(url, headers=UA_HEADERS)
     for attempt in range(1, retries + 1):
         try:
-            req = Request(url, headers={"User-Agent": "cfm-metric-cli/0.1"})
             with urlopen(req, timeout=timeout) as resp:
-                return json.loads(resp.read().decode("utf-8"))
+                return _loads(resp.read())
         except (HTTPError, URLError, TimeoutError, OSError) as exc:  # pragma: no cover - network
             last_error = exc
             if attempt == retries:
@@ -170,6 +179,29 @@ def fetch_payload(url: str, timeout: int, retries: int, backoff: float) -> Dict[
     raise MetricError(f"Failed to fetch CoinMarketCap data: {last_error}")
 
 
+def _loads(body: bytes) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # e.g. NaN/Infinity literals or a UTF-8 BOM; let the stdlib parser decide
+            pass
+    # json.loads detects UTF-8 itself; no intermediate str copy needed
+    return json.loads(body)
+
+
+def _dumps_pretty(obj: Any) -> str:
+    # Only for the bulky raw points dump: the output is equivalent JSON but not
+    # byte-identical to the stdlib (non-ASCII text, float exponents)
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+        except TypeError:
+            # e.g. integers beyond 64 bits; the stdlib encoder handles them
+            pass
+    return json.dumps(obj, indent=2)
+
+
 def normalize_timestamp(raw_ts: Any) -> int | None:
     value: float | int | None
     if isinstance(raw_ts, (int, float)):
@@ -178,6 +210,10 @@ def normalize_timestamp(raw_ts: Any) -> int | None:
         raw = raw_ts.strip()
         if not raw:
             return None
+        # CMC point keys are plain epoch digits; int() is exact and skips the float round trip
+        if raw.isascii() and raw.isdigit():
+            value = int(raw)
+            return value // 1000 if value > TIMESTAMP_MS_THRESHOLD else value
         try:
             value = float(raw)
         except ValueError:
@@ -205,7 +241,8 @@ def extract_price(sample: Any) -> Decimal | None:
     if candidate is None:
         return None
     try:
-        dec = Decimal(str(candidate))
+        # CMC quotes prices as strings; only non-str values need the str() hop
+        dec = Decimal(candidate if type(candidate) is str else str(candidate))
     except (InvalidOperation, ValueError):
         return None
     if dec <= 0:
@@ -222,6 +259,8 @@ def collect_window_prices(payload: Dict[str, Any], start: int, end: int) -> tupl
         raise MetricError("Unexpected payload format: missing data.points field.")
 
     latest_price_by_ts: Dict[int, Decimal] = {}
+    prev_ts = start
+    needs_sort = False
     for raw_ts, sample in points.items():
         ts = normalize_timestamp(raw_ts)
         if ts is None or not (start <= ts < end):
@@ -229,9 +268,16 @@ def collect_window_prices(payload: Dict[str, Any], start: int, end: int) -> tupl
         price = extract_price(sample)
         if price is None:
             continue
+        if ts < prev_ts:
+            needs_sort = True
+        prev_ts = ts
         latest_price_by_ts[ts] = price
 
-    ordered_items = sorted(latest_price_by_ts.items(), key=lambda item: item[0])
+    # CMC emits points in time order, so insertion order is usually already sorted;
+    # timestamps are unique keys, so a sort by tuple never compares prices
+    ordered_items = list(latest_price_by_ts.items())
+    if needs_sort:
+        ordered_items.sort()
     prices = [price for _, price in ordered_items]
 
     if not prices:
@@ -253,11 +299,15 @@ def median_price(values: Sequence[Decimal]) -> Decimal:
     mid = len(ordered) // 2
     if len(ordered) % 2 == 1:
         return ordered[mid]
-    return (ordered[mid - 1] + ordered[mid]) / Decimal(2)
+    with localcontext() as ctx:
+        ctx.prec = DECIMAL_PRECISION
+        return (ordered[mid - 1] + ordered[mid]) / Decimal(2)
 
 
 def ceil_cents(value: Decimal) -> int:
-    cents = value * Decimal(100)
+    with localcontext() as ctx:
+        ctx.prec = DECIMAL_PRECISION
+        cents = value * Decimal(100)
     return int(cents.to_integral_value(rounding=ROUND_CEILING))
 
 
@@ -273,7 +323,7 @@ def dump_raw_points(raw_path: Path | None, payload: Dict[str, Any]) -> None:
     if raw_path is None:
         return
     raw_path.parent.mkdir(parents=True, exist_ok=True)
-    raw_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    raw_path.write_text(_dumps_pretty(payload), encoding="utf-8")
 
 
 def run_metric(args: argparse.Namespace) -> Dict[str, Any]: